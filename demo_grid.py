@@ -3,16 +3,19 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 from train_grid import train_grid
+from q_learning.agent import policy_and_value
 
 def greedy_rollout(env, agent, max_steps=200):
     s = env.reset()
     path_coords = [env.state_to_coord[s]]
     total_r = 0.0
+    _values, actions = policy_and_value(agent.Q, env.mask)
 
     for _ in range(max_steps):
-        valid = env.valid_actions(s)
-        a = agent.predict_action(s, valid)
-        s, r, done, info = env.step(a)
+        # -1: keine gültige Aktion im Zustand, Rollout endet
+        if actions[s] < 0:
+            break
+        s, r, done, info = env.step(int(actions[s]))
         total_r += r
         path_coords.append(info["coord"])
         if done:
@@ -21,7 +24,8 @@ def greedy_rollout(env, agent, max_steps=200):
     return path_coords, total_r
 
 if __name__ == "__main__":
-    env, agent, returns, steps = train_grid(num_episodes=2000)
+    env, agent, metrics = train_grid(num_episodes=2000)
+    returns = metrics["episode_returns"]
 
     path, total_r = greedy_rollout(env, agent)
     print("Greedy-Path coords:", path)
@@ -42,4 +46,8 @@ if __name__ == "__main__":
     plt.legend()
     plt.tight_layout()
     plt.savefig("grid_training_returns.png")
+
+    # Value- und Greedy-Policy-Grid exportieren (NaN / -1 für Wände)
+    value_grid, action_grid = agent.policy_and_value_grids(env)
+    np.savez("grid_policy.npz", value=value_grid, action=action_grid)
     plt.show()
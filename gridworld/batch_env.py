@@ -0,0 +1,133 @@
+# gridworld/batch_env.py
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from gridworld.maps import GridMap, Coord
+from gridworld.env import compile_tables
+from gridworld.raster import GridRaster, as_raster
+
+
+class BatchGridWorldEnv:
+    """
+    N GridWorld-Episoden gleichzeitig auf derselben Karte, vollständig NumPy-vektorisiert.
+    Same cost model as GridWorldEnv; every env may have its own start/goal pair.
+    Finished envs stay frozen (reward 0, done=True) until they are reset.
+    """
+
+    def __init__(
+        self,
+        grid: Union[GridMap, GridRaster],
+        starts: Union[Coord, Sequence[Coord]] = (0, 0),
+        goals: Union[Coord, Sequence[Coord]] = (5, 5),
+        num_envs: Optional[int] = None,
+        max_steps: int = 200,
+        step_cost: float = -1.0,
+        goal_reward: float = 100.0,
+        invalid_move_penalty: float = -10.0,
+        bottleneck_base_penalty: float = -6.0,
+    ):
+        self.grid = grid
+        self.max_steps = max_steps
+        self.goal_reward = goal_reward
+        self.raster = as_raster(grid)
+
+        self.state_index, self.T, self.R_base, self.L = compile_tables(
+            self.raster,
+            step_cost=step_cost,
+            invalid_move_penalty=invalid_move_penalty,
+            bottleneck_base_penalty=bottleneck_base_penalty,
+        )
+        self.n_states, self.n_actions = self.T.shape
+        # A move is valid iff it leaves the cell (invalid moves keep the agent in place)
+        self.mask = self.T != np.arange(self.n_states)[:, None]
+        self.state_rows, self.state_cols = self.raster.state_rows, self.raster.state_cols
+
+        starts_arr = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        goals_arr = np.asarray(goals, dtype=np.int64).reshape(-1, 2)
+        if num_envs is None:
+            num_envs = max(len(starts_arr), len(goals_arr))
+        self.num_envs = num_envs
+        self.start_states = self._coords_to_states(np.broadcast_to(starts_arr, (num_envs, 2)))
+        self.goal_states = self._coords_to_states(np.broadcast_to(goals_arr, (num_envs, 2)))
+        self._check_reachable()
+
+        self._states = self.start_states.copy()
+        self._steps = np.zeros(num_envs, dtype=np.int64)
+        self._done = np.ones(num_envs, dtype=bool)
+
+    @property
+    def observation_space_n(self) -> int:
+        return self.n_states
+
+    @property
+    def action_space_n(self) -> int:
+        return self.n_actions
+
+    def _coords_to_states(self, coords: np.ndarray) -> np.ndarray:
+        r, c = coords[:, 0], coords[:, 1]
+        if np.any((r < 0) | (r >= self.grid.rows) | (c < 0) | (c >= self.grid.cols)):
+            raise ValueError("Start/Goal liegt ausserhalb der Karte.")
+        states = self.state_index[r, c]
+        if np.any(states < 0):
+            raise ValueError("Start/Goal darf nicht auf einer Wall liegen.")
+        return states
+
+    def _check_reachable(self) -> None:
+        components = self.raster.components
+        comp_start = components[self.state_rows[self.start_states], self.state_cols[self.start_states]]
+        comp_goal = components[self.state_rows[self.goal_states], self.state_cols[self.goal_states]]
+        if np.any(comp_start != comp_goal):
+            raise ValueError("Goal ist vom Start aus nicht erreichbar.")
+
+    def states_to_coords(self, states: np.ndarray) -> np.ndarray:
+        """(N,) state ids -> (N, 2) array of (row, col)."""
+        return np.stack([self.state_rows[states], self.state_cols[states]], axis=-1)
+
+    def set_start_goal(
+        self,
+        starts: Union[Coord, Sequence[Coord]],
+        goals: Union[Coord, Sequence[Coord]],
+    ) -> None:
+        starts_arr = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        goals_arr = np.asarray(goals, dtype=np.int64).reshape(-1, 2)
+        self.start_states = self._coords_to_states(np.broadcast_to(starts_arr, (self.num_envs, 2)))
+        self.goal_states = self._coords_to_states(np.broadcast_to(goals_arr, (self.num_envs, 2)))
+        self._check_reachable()
+
+    def valid_masks(self, states: np.ndarray) -> np.ndarray:
+        """(N,) state ids -> (N, n_actions) boolean mask of valid actions."""
+        return self.mask[states]
+
+    def reset(self, env_ids: Optional[np.ndarray] = None, *, seed: Optional[int] = None) -> np.ndarray:
+        """Resets all envs (or only `env_ids`) to their start state and returns all current states."""
+        if seed is not None:
+            np.random.seed(seed)
+        if env_ids is None:
+            env_ids = slice(None)
+        self._states[env_ids] = self.start_states[env_ids]
+        self._steps[env_ids] = 0
+        self._done[env_ids] = False
+        return self._states.copy()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict]:
+        actions = np.asarray(actions, dtype=np.int64)
+        # Negative Indizes würden sonst still die letzte Aktionsspalte treffen
+        invalid = (actions < 0) | (actions >= self.n_actions)
+        if np.any(invalid):
+            raise ValueError(f"Ungültige Aktion {int(actions[invalid][0])} (erlaubt: 0..{self.n_actions - 1}).")
+        active = ~self._done
+        s = self._states
+
+        s_next = np.where(active, self.T[s, actions], s)
+        level = np.where(active, self.L[s, actions], 0)
+        reached = active & (s_next == self.goal_states) & (s_next != s)
+        rewards = np.where(active, self.R_base[s, actions], 0.0) + self.goal_reward * reached
+
+        self._steps += active
+        self._states = s_next
+        self._done = self._done | (s_next == self.goal_states) | (self._steps >= self.max_steps)
+
+        info = {"steps": self._steps.copy(), "bottleneck_level": level, "reached_goal": reached}
+        return s_next.copy(), rewards, self._done.copy(), info
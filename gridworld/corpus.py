@@ -0,0 +1,132 @@
+# gridworld/corpus.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from gridworld.raster import GridRaster, random_raster
+
+INDEX_FILE = "index.json"
+
+
+def _shard_file(shard_id):
+    return f"shard_{shard_id:05d}.npz"
+
+
+def _write_shard(path, shard_id, first, n_maps, params, seed):
+    """Generates maps first..first+n_maps-1 and writes them as one compressed shard."""
+    cells = np.empty((n_maps, params["rows"], params["cols"]), dtype=np.uint8)
+    components = np.empty((n_maps, params["rows"], params["cols"]), dtype=np.int32)
+    for k in range(n_maps):
+        # Map i hat immer denselben Seed, unabhängig von Shard-Grösse und Worker-Anzahl
+        raster = random_raster(seed=np.random.SeedSequence(seed, spawn_key=(first + k,)), **params)
+        cells[k] = raster.cells
+        components[k] = raster.components
+    n_components = components.reshape(n_maps, -1).max(axis=1) + 1
+
+    final = os.path.join(path, _shard_file(shard_id))
+    tmp = final + ".tmp.npz"
+    np.savez_compressed(tmp, cells=cells, components=components, n_components=n_components)
+    os.replace(tmp, final)
+    return dict(file=_shard_file(shard_id), first=first, n_maps=n_maps,
+                mean_components=float(n_components.mean()))
+
+
+def _write_index(path, index):
+    tmp = os.path.join(path, INDEX_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, os.path.join(path, INDEX_FILE))
+
+
+def build_corpus(path, n_maps, rows=12, cols=12, wall_ratio=0.18, bottleneck_ratio=0.12,
+                 seed=0, shard_size=256, max_workers=None):
+    """
+    Generates n_maps random_raster floors in a ProcessPoolExecutor and stores them under `path`
+    as compressed shards (shard_XXXXX.npz: cells [n, rows, cols] uint8, component labels
+    [n, rows, cols] int32, n_components) plus
+    index.json. Shards already listed in the index are skipped, so an interrupted build
+    resumes by calling build_corpus again with the same arguments. Returns the MapCorpus.
+    """
+    os.makedirs(path, exist_ok=True)
+    params = dict(rows=rows, cols=cols, wall_ratio=wall_ratio, bottleneck_ratio=bottleneck_ratio)
+    meta = dict(params=params, seed=seed, n_maps=n_maps, shard_size=shard_size)
+
+    index_path = os.path.join(path, INDEX_FILE)
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if {k: index[k] for k in meta} != meta:
+            raise ValueError(f"{path} enthält einen Korpus mit anderen Parametern.")
+    else:
+        index = dict(meta, shards={})
+
+    n_shards = (n_maps + shard_size - 1) // shard_size
+    pending = [sid for sid in range(n_shards) if str(sid) not in index["shards"]]
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for sid in pending:
+                first = sid * shard_size
+                n = min(shard_size, n_maps - first)
+                futures[executor.submit(_write_shard, path, sid, first, n, params, seed)] = sid
+            for future in as_completed(futures):
+                index["shards"][str(futures[future])] = future.result()
+                _write_index(path, index)
+    elif not os.path.exists(index_path):
+        _write_index(path, index)
+
+    return MapCorpus(path)
+
+
+class MapCorpus:
+    """
+    Read access to a corpus written by build_corpus. Iterating streams the maps shard by
+    shard (only one shard in memory); corpus[i] loads a single map as GridRaster.
+    The rasters carry the stored component labels, so raster.components is not recomputed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.shards = sorted(self.index["shards"].values(), key=lambda sh: sh["first"])
+        self._firsts = np.array([sh["first"] for sh in self.shards], dtype=np.int64)
+        self._cached = (None, None)
+
+    def __len__(self):
+        return sum(sh["n_maps"] for sh in self.shards)
+
+    def load_shard(self, k):
+        """(cells, components) [n, rows, cols] of the k-th shard (the last loaded shard is cached)."""
+        if self._cached[0] != k:
+            with np.load(os.path.join(self.path, self.shards[k]["file"])) as data:
+                self._cached = (k, (data["cells"], data["components"]))
+        return self._cached[1]
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        k = int(np.searchsorted(self._firsts, i, side="right")) - 1
+        cells, components = self.load_shard(k)
+        j = i - self.shards[k]["first"]
+        return GridRaster(cells[j].copy(), components=components[j].copy())
+
+    def __iter__(self):
+        for k in range(len(self.shards)):
+            cells, components = self.load_shard(k)
+            for j in range(len(cells)):
+                yield GridRaster(cells[j].copy(), components=components[j].copy())
+
+
+def sample_start_goal(raster, rng):
+    """Random start/goal pair inside the same connected component (uniform start over free cells)."""
+    labels = raster.components
+    free = np.flatnonzero(labels.reshape(-1) >= 0)
+    start = int(free[rng.integers(len(free))])
+    same = np.flatnonzero(labels.reshape(-1) == labels.reshape(-1)[start])
+    if len(same) > 1:
+        same = same[same != start]
+    goal = int(same[rng.integers(len(same))])
+    return divmod(start, raster.cols), divmod(goal, raster.cols)
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, Union
 
 import numpy as np
 from gridworld.maps import GridMap, Coord
+from gridworld.raster import GridRaster, CoordToState, StateToCoord, WALL, as_raster, label_components
 
 Action = int
 # 0=UP, 1=RIGHT, 2=DOWN, 3=LEFT
@@ -16,6 +17,61 @@ DELTAS = {
     3: (0, -1),
 }
 
+# Gültige Aktionen je 4-Bit-Maskencode (Bit a = Aktion a gültig), geteilt von allen Zuständen
+# und deshalb schreibgeschützt (valid_actions gibt diese Arrays direkt zurück)
+_ACTIONS_BY_MASK_CODE = [np.array([a for a in DELTAS if code >> a & 1], dtype=np.int64) for code in range(16)]
+for _actions in _ACTIONS_BY_MASK_CODE:
+    _actions.flags.writeable = False
+del _actions
+
+
+def compile_tables(
+    grid: Union[GridMap, GridRaster],
+    step_cost: float = -1.0,
+    invalid_move_penalty: float = -10.0,
+    bottleneck_base_penalty: float = -6.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compiles a GridMap/GridRaster into dense tables: (state_index[r, c], next_state[s, a],
+    reward[s, a] without goal bonus, level[s, a] of the entered cell); invalid moves stay in s.
+    """
+    raster = as_raster(grid)
+    states = np.arange(raster.n_states, dtype=np.int32)
+    next_state, reward, level = compile_rows(raster, states, step_cost, invalid_move_penalty, bottleneck_base_penalty)
+    return raster.state_index, next_state, reward, level
+
+
+def compile_rows(
+    raster: GridRaster,
+    states: np.ndarray,
+    step_cost: float = -1.0,
+    invalid_move_penalty: float = -10.0,
+    bottleneck_base_penalty: float = -6.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """next_state/reward/level rows of compile_tables for the given state ids only."""
+    states = np.asarray(states, dtype=np.int32)
+    rows, cols = raster.state_rows[states], raster.state_cols[states]
+    blocked = raster.cells == WALL
+    levels = raster.levels
+
+    next_state = np.empty((len(states), len(DELTAS)), dtype=np.int32)
+    reward = np.empty((len(states), len(DELTAS)), dtype=float)
+    level = np.empty((len(states), len(DELTAS)), dtype=np.uint8)
+    # Zustände auf (nachträglich) gesperrten Zellen haben keine gültigen Züge
+    here_free = ~blocked[rows, cols]
+    for a, (dr, dc) in DELTAS.items():
+        nr, nc = rows + dr, cols + dc
+        ok = here_free & (nr >= 0) & (nr < raster.rows) & (nc >= 0) & (nc < raster.cols)
+        nr, nc = np.where(ok, nr, rows), np.where(ok, nc, cols)
+        target = raster.state_index[nr, nc]
+        ok &= (target >= 0) & ~blocked[nr, nc]
+        lvl = np.where(ok, levels[nr, nc], 0)
+        next_state[:, a] = np.where(ok, target, states)
+        reward[:, a] = np.where(ok, step_cost + bottleneck_base_penalty * lvl, invalid_move_penalty)
+        level[:, a] = lvl
+
+    return next_state, reward, level
+
 
 @dataclass
 class StepResult:
@@ -33,7 +89,7 @@ class GridWorldEnv:
 
     def __init__(
         self,
-        grid: GridMap,
+        grid: Union[GridMap, GridRaster],
         start: Coord = (0, 0),
         goal: Coord = (5, 5),
         max_steps: int = 200,
@@ -43,8 +99,6 @@ class GridWorldEnv:
         bottleneck_base_penalty: float = -6.0,
     ):
         self.grid = grid
-        self.start = start
-        self.goal = goal
         self.max_steps = max_steps
 
         self.step_cost = step_cost
@@ -53,25 +107,32 @@ class GridWorldEnv:
         self.bottleneck_base_penalty = bottleneck_base_penalty
 
         self._state: Optional[Coord] = None
+        self._sid: Optional[int] = None
         self._steps = 0
 
-        # Precompute state mapping for all non-wall cells
-        self.coord_to_state: Dict[Coord, int] = {}
-        self.state_to_coord: Dict[int, Coord] = {}
-        sid = 0
-        for r in range(grid.rows):
-            for c in range(grid.cols):
-                if (r, c) in grid.walls:
-                    continue
-                self.coord_to_state[(r, c)] = sid
-                self.state_to_coord[sid] = (r, c)
-                sid += 1
+        # Compact map: uint8 raster + int32 coord/state index arrays (no per-cell Python objects)
+        self.raster = as_raster(grid)
+        # Ein übergebener GridRaster wird erst beim ersten update_cells kopiert (copy-on-write)
+        self._shared_raster = self.raster is grid
+
+        # Compile the map once into dense tables: T (next state), R (reward incl. goal bonus),
+        # L (entered bottleneck level) and mask (valid actions), all [n_states, 4]
+        self.goal_state: Optional[int] = None
+        self.state_index, self.T, self.R, self.L = compile_tables(
+            self.raster,
+            step_cost=step_cost,
+            invalid_move_penalty=invalid_move_penalty,
+            bottleneck_base_penalty=bottleneck_base_penalty,
+        )
+        self.n_states, self.n_actions = self.T.shape
+        self.mask = self.T != np.arange(self.n_states)[:, None]
+        self._mask_code = (self.mask << np.arange(self.n_actions)).sum(axis=1).astype(np.uint8)
 
-        if start in grid.walls or goal in grid.walls:
-            raise ValueError("Start oder Goal darf nicht auf einer Wall liegen.")
+        # Dict-like views over the raster index arrays
+        self.coord_to_state = CoordToState(self.raster)
+        self.state_to_coord = StateToCoord(self.raster)
 
-        self.n_states = len(self.coord_to_state)
-        self.n_actions = 4
+        self.set_start_goal(start, goal)
 
     @property
     def observation_space_n(self) -> int:
@@ -81,63 +142,131 @@ class GridWorldEnv:
     def action_space_n(self) -> int:
         return self.n_actions
 
+    @property
+    def R_base(self) -> np.ndarray:
+        """Reward table without the goal bonus (copy)."""
+        R_base = self.R.copy()
+        src, act = self._incoming(self.goal_state)
+        R_base[src, act] = self.step_cost + self.bottleneck_base_penalty * self.L[src, act]
+        return R_base
+
+    def _incoming(self, state_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(states, actions) of all valid moves into state_id; grid moves are symmetric."""
+        a = np.flatnonzero(self.mask[state_id])
+        return self.T[state_id, a], (a + 2) % self.n_actions
+
     def set_start_goal(self, start: Coord, goal: Coord) -> None:
-        if start in self.grid.walls or goal in self.grid.walls:
+        if self.raster.is_wall(start) or self.raster.is_wall(goal):
             raise ValueError("Start/Goal darf nicht auf einer Wall liegen.")
+        if start not in self.coord_to_state or goal not in self.coord_to_state:
+            raise ValueError("Start/Goal liegt ausserhalb der Karte.")
+        if not self.raster.connected(start, goal):
+            raise ValueError("Goal ist vom Start aus nicht erreichbar.")
+        # Goal bonus only touches the <= 4 moves into the goal: undo old, apply new
+        if self.goal_state is not None:
+            src, act = self._incoming(self.goal_state)
+            self.R[src, act] = self.step_cost + self.bottleneck_base_penalty * self.L[src, act]
         self.start = start
         self.goal = goal
+        self.goal_state = self.coord_to_state[goal]
+        src, act = self._incoming(self.goal_state)
+        self.R[src, act] += self.goal_reward
+
+    def update_cells(self, changes: Dict[Coord, int]) -> np.ndarray:
+        """
+        Applies {coord: level 0-3 or WALL} to the env's own copy of the map and recompiles only the
+        touched transitions (state ids stay stable, opened cells are appended); returns affected ids.
+        """
+        if not changes:
+            return np.zeros(0, dtype=np.int32)
+        coords = np.array(list(changes.keys()), dtype=np.int32).reshape(-1, 2)
+        values = np.array(list(changes.values()), dtype=np.int64)
+        rows, cols = coords[:, 0], coords[:, 1]
+        if np.any((rows < 0) | (rows >= self.raster.rows) | (cols < 0) | (cols >= self.raster.cols)):
+            raise ValueError("Zelle liegt ausserhalb der Karte.")
+        if np.any(((values < 0) | (values > 3)) & (values != WALL)):
+            raise ValueError(f"Zellwerte müssen 0-3 (Bottleneck-Level) oder WALL={WALL} sein.")
+        values = values.astype(np.uint8)
+        for coord, value in changes.items():
+            if value == WALL and tuple(coord) in (tuple(self.start), tuple(self.goal)):
+                raise ValueError("Start/Goal darf nicht auf einer Wall liegen.")
+        # Erreichbarkeit auf der neuen Karte prüfen, bevor etwas verändert wird (Labels werden weiterverwendet)
+        cells = self.raster.cells.copy()
+        cells[rows, cols] = values
+        components = label_components(cells)
+        if components[self.start] != components[self.goal]:
+            raise ValueError("Goal ist vom Start aus nicht erreichbar.")
+
+        if self._shared_raster:
+            self.raster = self.raster.copy()
+            self.coord_to_state = CoordToState(self.raster)
+            self.state_to_coord = StateToCoord(self.raster)
+            self._shared_raster = False
+        n_new = self.raster.update_cells(rows, cols, values, components=components)
+        self.grid = self.raster
+        if n_new:
+            own = np.arange(self.n_states, self.n_states + n_new, dtype=self.T.dtype)
+            self.T = np.concatenate([self.T, np.repeat(own[:, None], self.n_actions, axis=1)])
+            self.R = np.concatenate([self.R, np.zeros((n_new, self.n_actions), dtype=self.R.dtype)])
+            self.L = np.concatenate([self.L, np.zeros((n_new, self.n_actions), dtype=self.L.dtype)])
+            self.mask = np.concatenate([self.mask, np.zeros((n_new, self.n_actions), dtype=bool)])
+            self._mask_code = np.concatenate([self._mask_code, np.zeros(n_new, dtype=np.uint8)])
+            self.n_states += n_new
+
+        # Betroffen: geänderte Zellen und ihre 4 Nachbarn
+        offsets = np.array([(0, 0)] + list(DELTAS.values()), dtype=np.int32)
+        nb = (coords[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+        inside = (nb[:, 0] >= 0) & (nb[:, 0] < self.raster.rows) & (nb[:, 1] >= 0) & (nb[:, 1] < self.raster.cols)
+        sids = self.raster.state_index[nb[inside, 0], nb[inside, 1]]
+        affected = np.unique(sids[sids >= 0])
+
+        T_rows, R_rows, L_rows = compile_rows(
+            self.raster, affected, self.step_cost, self.invalid_move_penalty, self.bottleneck_base_penalty
+        )
+        mask_rows = T_rows != affected[:, None]
+        R_rows += self.goal_reward * (mask_rows & (T_rows == self.goal_state))
+        self.T[affected] = T_rows
+        self.R[affected] = R_rows
+        self.L[affected] = L_rows
+        self.mask[affected] = mask_rows
+        self._mask_code[affected] = (mask_rows << np.arange(self.n_actions)).sum(axis=1)
+        return affected
 
     def reset(self, *, seed: Optional[int] = None) -> int:
         if seed is not None:
             np.random.seed(seed)
         self._state = self.start
+        self._sid = self.coord_to_state[self.start]
         self._steps = 0
-        return self.coord_to_state[self._state]
-
-    def _in_bounds(self, r: int, c: int) -> bool:
-        return 0 <= r < self.grid.rows and 0 <= c < self.grid.cols
-
-    def valid_actions(self, state_id: int):
-        coord = self.state_to_coord[state_id]
-        valid = []
-        for a, (dr, dc) in DELTAS.items():
-            nr, nc = coord[0] + dr, coord[1] + dc
-            if not self._in_bounds(nr, nc):
-                continue
-            if (nr, nc) in self.grid.walls:
-                continue
-            valid.append(a)
-        return valid
+        return self._sid
+
+    def to_grid(self, per_state: np.ndarray, fill=np.nan) -> np.ndarray:
+        """Scatters a per-state array into a [rows, cols] grid via the raster index arrays (`fill` elsewhere)."""
+        per_state = np.asarray(per_state)
+        out = np.full(self.raster.cells.shape, fill, dtype=np.result_type(per_state, np.min_scalar_type(fill)))
+        out[self.raster.state_rows, self.raster.state_cols] = per_state
+        return out
+
+    def valid_actions(self, state_id: int) -> np.ndarray:
+        return _ACTIONS_BY_MASK_CODE[self._mask_code[state_id]]
 
     def step(self, action: Action) -> Tuple[int, float, bool, Dict]:
         if self._state is None:
             raise RuntimeError("Call reset() before step().")
+        # Negative Indizes würden sonst still die letzte Aktionsspalte treffen
+        if not 0 <= action < self.n_actions:
+            raise ValueError(f"Ungültige Aktion {action} (erlaubt: 0..{self.n_actions - 1}).")
 
         self._steps += 1
-        r, c = self._state
-        dr, dc = DELTAS[action]
-        nr, nc = r + dr, c + dc
-
-        # Invalid move: out of bounds or wall
-        if (not self._in_bounds(nr, nc)) or ((nr, nc) in self.grid.walls):
-            reward = self.invalid_move_penalty
-            next_coord = self._state
-            level = 0
-        else:
-            next_coord = (nr, nc)
-            reward = self.step_cost
-
-            # Bottleneck severity (0 if not a bottleneck)
-            level = self.grid.bottlenecks.get(next_coord, 0)
-            if level > 0:
-                reward += self.bottleneck_base_penalty * level
-
-            if next_coord == self.goal:
-                reward += self.goal_reward
-
-        self._state = next_coord
-        done = (self._state == self.goal) or (self._steps >= self.max_steps)
-
-        next_state_id = self.coord_to_state[self._state]
+        s = self._sid
+        # Invalid moves (out of bounds or wall) keep the state and cost invalid_move_penalty
+        next_state_id = int(self.T[s, action])
+        reward = self.R[s, action]
+        level = int(self.L[s, action])
+
+        self._sid = next_state_id
+        self._state = self.state_to_coord[next_state_id]
+        done = (next_state_id == self.goal_state) or (self._steps >= self.max_steps)
+
         info = {"coord": self._state, "steps": self._steps, "bottleneck_level": level}
         return next_state_id, float(reward), bool(done), info
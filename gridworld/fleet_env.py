@@ -0,0 +1,184 @@
+# gridworld/fleet_env.py
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+from gridworld.maps import GridMap, Coord
+from gridworld.env import compile_tables
+from gridworld.raster import GridRaster, WALL, as_raster, label_components
+
+
+class FleetGridWorldEnv:
+    """
+    K Roboter gleichzeitig auf einer Karte (Positionen als Arrays, ein Schritt = alle Agenten).
+    GridWorldEnv costs plus collision_penalty for blocked moves (same target, swaps) and congestion_penalty
+    per other agent in the same bottleneck region; agents leave the floor at their goal.
+    """
+
+    def __init__(
+        self,
+        grid: Union[GridMap, GridRaster],
+        starts: Sequence[Coord],
+        goals: Union[Coord, Sequence[Coord]],
+        max_steps: int = 200,
+        step_cost: float = -1.0,
+        goal_reward: float = 100.0,
+        invalid_move_penalty: float = -10.0,
+        bottleneck_base_penalty: float = -6.0,
+        collision_penalty: float = -2.0,
+        congestion_penalty: float = -2.0,
+    ):
+        self.grid = grid
+        self.max_steps = max_steps
+        self.step_cost = step_cost
+        self.goal_reward = goal_reward
+        self.collision_penalty = collision_penalty
+        self.congestion_penalty = congestion_penalty
+        self.raster = as_raster(grid)
+
+        self.state_index, self.T, self.R_base, self.L = compile_tables(
+            self.raster,
+            step_cost=step_cost,
+            invalid_move_penalty=invalid_move_penalty,
+            bottleneck_base_penalty=bottleneck_base_penalty,
+        )
+        self.n_states, self.n_actions = self.T.shape
+        self.mask = self.T != np.arange(self.n_states)[:, None]
+        self.state_rows, self.state_cols = self.raster.state_rows, self.raster.state_cols
+
+        # Zusammenhängende Bottleneck-Regionen (-1 ausserhalb) und Level je Zustand
+        levels = self.raster.levels
+        regions = label_components(np.where(levels > 0, 0, WALL).astype(np.uint8))
+        self.state_region = regions[self.state_rows, self.state_cols]
+        self.state_level = levels[self.state_rows, self.state_cols].astype(float)
+        self.n_regions = int(regions.max()) + 1
+
+        self.set_start_goal(starts, goals)
+        # Belegung Zelle -> Agent, nur während step gefüllt
+        self._occ = np.full(self.n_states, -1, dtype=np.int64)
+
+    @property
+    def observation_space_n(self) -> int:
+        return self.n_states
+
+    @property
+    def action_space_n(self) -> int:
+        return self.n_actions
+
+    @property
+    def active(self) -> np.ndarray:
+        """Agents still on the floor."""
+        return ~self._done
+
+    def _coords_to_states(self, coords: np.ndarray) -> np.ndarray:
+        r, c = coords[:, 0], coords[:, 1]
+        if np.any((r < 0) | (r >= self.raster.rows) | (c < 0) | (c >= self.raster.cols)):
+            raise ValueError("Start/Goal liegt ausserhalb der Karte.")
+        states = self.state_index[r, c]
+        if np.any(states < 0):
+            raise ValueError("Start/Goal darf nicht auf einer Wall liegen.")
+        return states.astype(np.int64)
+
+    def set_start_goal(self, starts: Sequence[Coord], goals: Union[Coord, Sequence[Coord]]) -> None:
+        """One start per agent (pairwise distinct); goals per agent or one shared goal."""
+        starts_arr = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        self.n_agents = len(starts_arr)
+        goals_arr = np.broadcast_to(np.asarray(goals, dtype=np.int64).reshape(-1, 2), (self.n_agents, 2))
+        start_states = self._coords_to_states(starts_arr)
+        goal_states = self._coords_to_states(goals_arr)
+        if len(np.unique(start_states)) != self.n_agents:
+            raise ValueError("Startzellen der Agenten müssen verschieden sein.")
+        components = self.raster.components
+        if np.any(components[starts_arr[:, 0], starts_arr[:, 1]] != components[goals_arr[:, 0], goals_arr[:, 1]]):
+            raise ValueError("Goal ist vom Start aus nicht erreichbar.")
+        self.start_states = start_states
+        self.goal_states = goal_states
+        self._states = start_states.copy()
+        self._steps = 0
+        self._done = np.ones(self.n_agents, dtype=bool)
+
+    def states_to_coords(self, states: np.ndarray) -> np.ndarray:
+        """(K,) state ids -> (K, 2) array of (row, col)."""
+        return np.stack([self.state_rows[states], self.state_cols[states]], axis=-1)
+
+    def valid_masks(self, states: np.ndarray) -> np.ndarray:
+        """(K,) state ids -> (K, n_actions) boolean mask of valid actions (other agents are not masked)."""
+        return self.mask[states]
+
+    def reset(self, *, seed=None) -> np.ndarray:
+        if seed is not None:
+            np.random.seed(seed)
+        self._states = self.start_states.copy()
+        self._steps = 0
+        self._done = np.zeros(self.n_agents, dtype=bool)
+        return self._states.copy()
+
+    def _resolve(self, s: np.ndarray, proposed: np.ndarray, on: np.ndarray) -> np.ndarray:
+        """Mask of agents whose move is blocked by another agent (same target cell or swap)."""
+        idx = np.arange(self.n_agents)
+        moving = on & (proposed != s)
+        blocked = np.zeros(self.n_agents, dtype=bool)
+        # Zufällige Priorität pro Schritt; stehende Agenten (Key 0) behalten ihre Zelle immer
+        prio = np.random.permutation(self.n_agents) + 1
+        occ = self._occ
+        occ[s[on]] = idx[on]
+        on_ids = idx[on]
+        best = np.empty(self.n_states, dtype=np.int64)
+        while True:
+            target = np.where(moving, proposed, s)
+            key = np.where(moving, prio, 0)
+            best[target[on_ids]] = self.n_agents + 1
+            np.minimum.at(best, target[on_ids], key[on_ids])
+            lose = moving & (key > best[target])
+            # Tausch zweier Agenten (A -> B und B -> A) ist nicht erlaubt
+            j = occ[target]
+            lose |= moving & (j >= 0) & (j != idx) & moving[j] & (target[j] == s)
+            if not lose.any():
+                break
+            moving &= ~lose
+            blocked |= lose
+        occ[s[on]] = -1
+        return blocked
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict]:
+        actions = np.asarray(actions, dtype=np.int64)
+        # Negative Indizes würden sonst still die letzte Aktionsspalte treffen
+        invalid = (actions < 0) | (actions >= self.n_actions)
+        if np.any(invalid):
+            raise ValueError(f"Ungültige Aktion {int(actions[invalid][0])} (erlaubt: 0..{self.n_actions - 1}).")
+        on = ~self._done
+        s = self._states
+
+        proposed = np.where(on, self.T[s, actions], s)
+        blocked = self._resolve(s, proposed, on)
+        moved = on & ~blocked
+        s_next = np.where(moved, proposed, s)
+
+        level = np.where(moved, self.L[s, actions], 0)
+        reached = moved & (s_next == self.goal_states) & (s_next != s)
+        rewards = np.where(moved, self.R_base[s, actions], 0.0)
+        rewards += np.where(blocked, self.step_cost + self.collision_penalty, 0.0)
+        rewards += self.goal_reward * reached
+
+        # Stau: andere aktive Agenten in derselben Bottleneck-Region
+        region = self.state_region[s_next]
+        in_region = on & (region >= 0)
+        counts = np.bincount(region[in_region], minlength=self.n_regions + 1)
+        crowd = np.where(in_region, counts[np.maximum(region, 0)] - 1, 0)
+        congestion = self.congestion_penalty * self.state_level[s_next] * crowd
+        rewards += congestion
+
+        self._steps += 1
+        self._states = s_next
+        self._done = self._done | reached | (self._steps >= self.max_steps)
+
+        info = {
+            "steps": self._steps,
+            "active": on,
+            "blocked": blocked,
+            "bottleneck_level": level,
+            "congestion": congestion,
+            "reached_goal": reached,
+        }
+        return s_next.copy(), rewards, self._done.copy(), info
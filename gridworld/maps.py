@@ -19,6 +19,13 @@ def all_cells(rows: int, cols: int) -> List[Coord]:
     return [(r, c) for r in range(rows) for c in range(cols)]
 
 
+def default_map_6x6() -> GridMap:
+    """Fixed 6x6 demo map, start (0,0) and goal (5,5) are connected."""
+    walls = {(1, 1), (1, 2), (2, 4), (3, 1), (3, 2), (4, 4)}
+    bottlenecks = {(0, 3): 1, (2, 2): 2, (3, 4): 3, (4, 2): 1, (5, 3): 2}
+    return GridMap(rows=6, cols=6, walls=walls, bottlenecks=bottlenecks)
+
+
 def random_map(
     rows: int = 12,
     cols: int = 12,
@@ -0,0 +1,301 @@
+# gridworld/raster.py
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Set, Union
+
+import numpy as np
+from gridworld.maps import GridMap, Coord
+
+# Zellwerte im uint8-Raster: 0 = frei, 1..3 = Bottleneck-Level, WALL = blockiert
+WALL = 255
+
+
+class GridRaster:
+    """
+    Compact GridMap: one uint8 per cell plus int32 index arrays
+    (state_index[r, c] -> state id or -1, state_rows/state_cols[state id] -> coord).
+    After update_cells, cells closed to WALL keep their state id (see update_cells).
+    Exposes rows/cols/walls/bottlenecks so it can be used wherever a GridMap is expected;
+    walls/bottlenecks are built lazily and only for code that still needs sets/dicts.
+    """
+
+    def __init__(self, cells: np.ndarray, components: Optional[np.ndarray] = None):
+        """`components` are precomputed label_components(cells) labels (e.g. from a corpus shard)."""
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)
+        self.rows, self.cols = self.cells.shape
+        self._reindex()
+        self._components = components
+
+    def _reindex(self) -> None:
+        free = self.cells != WALL
+        rows, cols = np.nonzero(free)
+        self.state_rows = rows.astype(np.int32)
+        self.state_cols = cols.astype(np.int32)
+        self.state_index = np.full(self.cells.shape, -1, dtype=np.int32)
+        self.state_index[rows, cols] = np.arange(len(rows), dtype=np.int32)
+        self._walls = None
+        self._bottlenecks = None
+        self._components = None
+
+    @classmethod
+    def from_arrays(cls, cells: np.ndarray, state_index: np.ndarray,
+                    state_rows: np.ndarray, state_cols: np.ndarray) -> "GridRaster":
+        """Wraps precomputed index arrays (e.g. memory-mapped from a cache) without reindexing."""
+        raster = cls.__new__(cls)
+        raster.cells = cells
+        raster.rows, raster.cols = cells.shape
+        raster.state_index = state_index
+        raster.state_rows = state_rows
+        raster.state_cols = state_cols
+        raster._walls = None
+        raster._bottlenecks = None
+        raster._components = None
+        return raster
+
+    def copy(self) -> "GridRaster":
+        """Independent copy (cells and index arrays), e.g. before in-place updates of a shared raster."""
+        return GridRaster.from_arrays(np.array(self.cells), self.state_index.copy(),
+                                      self.state_rows.copy(), self.state_cols.copy())
+
+    @classmethod
+    def from_grid_map(cls, grid: GridMap) -> "GridRaster":
+        cells = np.zeros((grid.rows, grid.cols), dtype=np.uint8)
+        if grid.bottlenecks:
+            br, bc = np.array(list(grid.bottlenecks.keys())).T
+            cells[br, bc] = np.fromiter(grid.bottlenecks.values(), dtype=np.uint8)
+        if grid.walls:
+            wr, wc = np.array(list(grid.walls)).T
+            cells[wr, wc] = WALL
+        return cls(cells)
+
+    def to_grid_map(self) -> GridMap:
+        return GridMap(rows=self.rows, cols=self.cols, walls=set(self.walls), bottlenecks=dict(self.bottlenecks))
+
+    @property
+    def n_states(self) -> int:
+        return len(self.state_rows)
+
+    @property
+    def wall_mask(self) -> np.ndarray:
+        return self.cells == WALL
+
+    @property
+    def levels(self) -> np.ndarray:
+        """Bottleneck level per cell (0 for free cells and walls)."""
+        return np.where(self.cells == WALL, 0, self.cells)
+
+    @property
+    def walls(self) -> Set[Coord]:
+        if self._walls is None:
+            r, c = np.nonzero(self.cells == WALL)
+            self._walls = set(zip(r.tolist(), c.tolist()))
+        return self._walls
+
+    @property
+    def bottlenecks(self) -> Dict[Coord, int]:
+        if self._bottlenecks is None:
+            r, c = np.nonzero((self.cells > 0) & (self.cells != WALL))
+            self._bottlenecks = dict(zip(zip(r.tolist(), c.tolist()), self.cells[r, c].tolist()))
+        return self._bottlenecks
+
+    @property
+    def components(self) -> np.ndarray:
+        """Connected-component label per cell ([rows, cols] int32, -1 for walls), computed lazily."""
+        if self._components is None:
+            self._components = label_components(self.cells)
+        return self._components
+
+    def connected(self, a: Coord, b: Coord) -> bool:
+        """O(1) reachability check between two cells (False if either is a wall or out of bounds)."""
+        if not (self.in_bounds(a) and self.in_bounds(b)):
+            return False
+        la = self.components[a]
+        return bool(la >= 0 and la == self.components[b])
+
+    def update_cells(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                     components: Optional[np.ndarray] = None) -> int:
+        """
+        In-place cell update (level 0-3 or WALL) that keeps existing state ids stable:
+        closed cells keep their (then unreachable) state id, opened wall cells get new ids
+        appended after the existing ones. Returns the number of new states.
+        Mutates this object: every env built on it sees the change (GridWorldEnv copies first).
+        `components` may pass already computed labels of the updated cells.
+        """
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        self.cells[rows, cols] = np.asarray(values, dtype=np.uint8)
+        self._walls = None
+        self._bottlenecks = None
+        self._components = components
+
+        opened = (self.cells[rows, cols] != WALL) & (self.state_index[rows, cols] < 0)
+        flat = np.unique(rows[opened].astype(np.int64) * self.cols + cols[opened])
+        if len(flat) == 0:
+            return 0
+        new_rows, new_cols = (flat // self.cols).astype(np.int32), (flat % self.cols).astype(np.int32)
+        self.state_index[new_rows, new_cols] = np.arange(self.n_states, self.n_states + len(flat), dtype=np.int32)
+        self.state_rows = np.concatenate([self.state_rows, new_rows])
+        self.state_cols = np.concatenate([self.state_cols, new_cols])
+        return len(flat)
+
+    def in_bounds(self, coord: Coord) -> bool:
+        r, c = coord
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_wall(self, coord: Coord) -> bool:
+        return self.in_bounds(coord) and self.cells[coord] == WALL
+
+
+def label_components(cells: np.ndarray) -> np.ndarray:
+    """
+    4-connected components of the non-wall cells, vectorized: every round hooks the
+    representative of each edge's larger end onto the smaller one, then pointer jumping
+    compresses all chains to their roots (O(log n) rounds in practice).
+    Returns [rows, cols] int32 labels 0..k-1 (-1 for walls).
+    """
+    rows, cols = cells.shape
+    free = (cells != WALL).reshape(-1)
+    idx = np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+    free2d = free.reshape(rows, cols)
+
+    # Kanten zwischen freien Nachbarn (rechts, unten)
+    h = free2d[:, :-1] & free2d[:, 1:]
+    v = free2d[:-1, :] & free2d[1:, :]
+    u = np.concatenate([idx[:, :-1][h], idx[:-1, :][v]])
+    w = np.concatenate([idx[:, 1:][h], idx[1:, :][v]])
+
+    parent = np.arange(rows * cols, dtype=np.int64)
+    while True:
+        pu, pw = parent[u], parent[w]
+        differ = pu != pw
+        if not differ.any():
+            break
+        lo = np.minimum(pu[differ], pw[differ])
+        hi = np.maximum(pu[differ], pw[differ])
+        np.minimum.at(parent, hi, lo)
+        # Pointer Jumping bis alle Zeiger auf Wurzeln zeigen
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    labels = np.full(rows * cols, -1, dtype=np.int32)
+    _roots, labels[free] = np.unique(parent[free], return_inverse=True)
+    return labels.reshape(rows, cols)
+
+
+def random_raster(
+    rows: int = 12,
+    cols: int = 12,
+    wall_ratio: float = 0.18,
+    bottleneck_ratio: float = 0.12,
+    seed: Optional[Union[int, np.random.SeedSequence]] = None,
+) -> GridRaster:
+    """
+    NumPy version of maps.random_map for large floors, returning a GridRaster directly.
+    Same model: a random monotone R/D corridor from (0,0) to (rows-1, cols-1), widened
+    with p=0.25 per neighbour, kept free of walls (connectivity guarantee); walls are
+    sampled from the remaining cells, bottlenecks from all free cells with levels
+    1/2/3 at 60/30/10 %. Reproducible per seed (its own stream, not random_map's).
+    """
+    rng = np.random.default_rng(seed)
+    n_cells = rows * cols
+
+    # 1) Korridor: Münzwurf D/R pro Schritt, nach Erreichen einer Kante nur noch die andere Richtung
+    n_moves = rows + cols - 2
+    down = rng.random(n_moves) < 0.5
+    if rows > 1 and cols > 1:
+        d_cum = np.cumsum(down)
+        r_cum = np.arange(1, n_moves + 1) - d_cum
+        k = int(np.argmax((d_cum >= rows - 1) | (r_cum >= cols - 1)))
+        down[k + 1:] = d_cum[k] < rows - 1
+    else:
+        down[:] = rows > 1
+    cr = np.concatenate([[0], np.cumsum(down)])
+    cc = np.concatenate([[0], np.cumsum(~down)])
+
+    # 2) Korridor verbreitern: jeder Nachbar mit p=0.25
+    corridor = np.zeros((rows, cols), dtype=bool)
+    corridor[cr, cc] = True
+    grow = rng.random((len(cr), 4)) < 0.25
+    nr = (cr[:, None] + np.array([-1, 1, 0, 0]))[grow]
+    nc = (cc[:, None] + np.array([0, 0, -1, 1]))[grow]
+    inside = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+    corridor[nr[inside], nc[inside]] = True
+
+    # 3) Wände ausserhalb von Korridor/Start/Ziel
+    reserved = corridor.reshape(-1).copy()
+    reserved[[0, n_cells - 1]] = True
+    candidates = np.flatnonzero(~reserved)
+    n_walls = min(int(n_cells * wall_ratio), len(candidates))
+    cells = np.zeros(n_cells, dtype=np.uint8)
+    cells[rng.choice(candidates, size=n_walls, replace=False)] = WALL
+
+    # 4) Bottlenecks auf freien Zellen (nicht Start/Ziel), Level 1/2/3 mit 60/30/10 %
+    free = cells != WALL
+    free[[0, n_cells - 1]] = False
+    free_idx = np.flatnonzero(free)
+    n_bottlenecks = min(int(n_cells * bottleneck_ratio), len(free_idx))
+    chosen = rng.choice(free_idx, size=n_bottlenecks, replace=False)
+    u = rng.random(n_bottlenecks)
+    cells[chosen] = 1 + (u >= 0.60) + (u >= 0.90)
+
+    return GridRaster(cells.reshape(rows, cols))
+
+
+def as_raster(grid: Union[GridMap, GridRaster]) -> GridRaster:
+    return grid if isinstance(grid, GridRaster) else GridRaster.from_grid_map(grid)
+
+
+class CoordToState(Mapping):
+    """Read-only dict-like view coord -> state id backed by GridRaster.state_index (non-wall cells only)."""
+
+    def __init__(self, raster: GridRaster):
+        self._raster = raster
+
+    def __getitem__(self, coord: Coord) -> int:
+        try:
+            r, c = coord
+        except (TypeError, ValueError):
+            raise KeyError(coord)
+        rs = self._raster
+        if not rs.in_bounds((r, c)) or rs.state_index[r, c] < 0 or rs.cells[r, c] == WALL:
+            raise KeyError(coord)
+        return int(rs.state_index[r, c])
+
+    def _live(self) -> np.ndarray:
+        # Nachträglich geschlossene Zellen behalten ihre State-ID, gehören aber nicht in die Sicht
+        rs = self._raster
+        return np.flatnonzero(rs.cells[rs.state_rows, rs.state_cols] != WALL)
+
+    def __iter__(self) -> Iterator[Coord]:
+        live = self._live()
+        return zip(self._raster.state_rows[live].tolist(), self._raster.state_cols[live].tolist())
+
+    def __len__(self) -> int:
+        return len(self._live())
+
+    def items(self):
+        rs = self._raster
+        live = self._live()
+        return zip(zip(rs.state_rows[live].tolist(), rs.state_cols[live].tolist()), live.tolist())
+
+
+class StateToCoord(Mapping):
+    """Read-only dict-like view state id -> coord backed by GridRaster.state_rows/state_cols."""
+
+    def __init__(self, raster: GridRaster):
+        self._raster = raster
+
+    def __getitem__(self, state_id: int) -> Coord:
+        if not 0 <= state_id < self._raster.n_states:
+            raise KeyError(state_id)
+        return int(self._raster.state_rows[state_id]), int(self._raster.state_cols[state_id])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._raster.n_states))
+
+    def __len__(self) -> int:
+        return self._raster.n_states
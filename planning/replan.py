@@ -0,0 +1,77 @@
+# planning/replan.py
+import heapq
+
+import numpy as np
+
+from planning.solvers import value_iteration
+
+
+def grow_q(Q, n_states):
+    """Pads a Q-table with zero rows for states appended by GridWorldEnv.update_cells."""
+    if Q.shape[0] >= n_states:
+        return Q
+    pad = np.zeros((n_states - Q.shape[0], Q.shape[1]), dtype=Q.dtype)
+    return np.concatenate([Q, pad])
+
+
+def _state_values(Q, mask, states, goal):
+    q = np.where(mask[states], Q[states], -np.inf).max(axis=1)
+    q[~np.isfinite(q) | (states == goal)] = 0.0
+    return q
+
+
+def _backup_rows(V, T, R, mask, states, gamma):
+    """Full model backup of the Q rows of `states` (0 on invalid actions, as in planning.solvers)."""
+    return np.where(mask[states], R[states] + gamma * V[T[states]], 0.0)
+
+
+def local_sweep(Q, T, R, mask, goal, affected, gamma=0.75, theta=1e-6, max_backups=None):
+    """
+    Repairs a planner Q-table (value_iteration / policy_iteration) in place after
+    GridWorldEnv.update_cells by prioritized sweeping from the `affected` states.
+    Learned Q-tables have residuals everywhere, so they hit the backup budget
+    (default max(1000, n_states // 10)) and fall back to a full value_iteration.
+    Returns the number of local backups performed.
+    """
+    n_states = T.shape[0]
+    if max_backups is None:
+        max_backups = max(1_000, n_states // 10)
+    V = _state_values(Q, mask, np.arange(n_states), goal)
+    # Aktuelle Priorität je Zustand (0 = nicht in der Queue); veraltete Heap-Einträge werden übersprungen
+    priority = np.zeros(n_states)
+    heap = []
+
+    def push(states):
+        states = np.unique(states)
+        if len(states) == 0:
+            return
+        q_new = _backup_rows(V, T, R, mask, states, gamma)
+        residual = np.where(mask[states], np.abs(q_new - Q[states]), 0.0).max(axis=1)
+        queue = residual > theta
+        for s, r in zip(states[queue].tolist(), residual[queue].tolist()):
+            if r > priority[s]:
+                priority[s] = r
+                heapq.heappush(heap, (-r, s))
+
+    affected = np.unique(np.asarray(affected, dtype=np.int64))
+    push(np.concatenate([affected, T[affected][mask[affected]]]))
+    # Geänderte Zustände ohne gültige Züge (geschlossene Zellen) direkt auf das Planer-Format setzen
+    dead = affected[~mask[affected].any(axis=1)]
+    Q[dead] = 0.0
+
+    n_backups = 0
+    while heap and n_backups < max_backups:
+        neg_r, s = heapq.heappop(heap)
+        if priority[s] != -neg_r:
+            continue
+        priority[s] = 0.0
+        Q[s] = _backup_rows(V, T, R, mask, np.array([s]), gamma)[0]
+        v_old = V[s]
+        V[s] = _state_values(Q, mask, np.array([s]), goal)[0]
+        n_backups += 1
+        if V[s] != v_old:
+            push(T[s][mask[s]])
+    if priority.any():
+        # Budget erschöpft (Änderung wirkt global oder Q war kein Planer-Ergebnis): volle VI ist billiger
+        Q[...] = value_iteration(T, R, mask, goal, gamma=gamma)
+    return n_backups
@@ -0,0 +1,146 @@
+# planning/shortest_path.py
+from __future__ import annotations
+
+import heapq
+from typing import List, Tuple
+
+import numpy as np
+from gridworld.maps import GridMap, Coord
+from gridworld.env import DELTAS, compile_tables
+from gridworld.raster import GridRaster, WALL, as_raster
+
+
+def _edge_costs(grid: GridMap, step_cost: float, bottleneck_base_penalty: float):
+    """Raster and positive move costs per [state, action] from the GridWorldEnv cost model (inf = invalid)."""
+    raster = as_raster(grid)
+    _state_index, T, R_base, _L = compile_tables(
+        raster, step_cost=step_cost, bottleneck_base_penalty=bottleneck_base_penalty
+    )
+    mask = T != np.arange(T.shape[0])[:, None]
+    cost = np.where(mask, -R_base, np.inf)
+    if np.any(cost < 0):
+        raise ValueError("Kürzeste Wege brauchen nicht-negative Kosten (step_cost/Penalty <= 0).")
+    return raster, T, cost
+
+
+def _state_id(raster: GridRaster, coord: Coord) -> int:
+    r, c = coord
+    if not raster.in_bounds(coord) or raster.state_index[r, c] < 0 or raster.cells[r, c] == WALL:
+        raise ValueError(f"{coord} ist keine begehbare Zelle.")
+    return int(raster.state_index[r, c])
+
+
+def shortest_path(
+    grid: GridMap,
+    start: Coord,
+    goal: Coord,
+    step_cost: float = -1.0,
+    bottleneck_base_penalty: float = -6.0,
+    use_heuristic: bool = True,
+) -> Tuple[List[Coord], float]:
+    """
+    Cost-optimal path from start to goal (A* with Manhattan heuristic, Dijkstra if use_heuristic=False).
+    Each move into a cell costs -(step_cost + bottleneck_base_penalty * level), like GridWorldEnv.step.
+    Returns (path incl. start and goal, total cost); ([], inf) if the goal is unreachable.
+    """
+    raster, T, cost = _edge_costs(grid, step_cost, bottleneck_base_penalty)
+    s0 = _state_id(raster, start)
+    sg = _state_id(raster, goal)
+    # State-Ids sind nach update_cells nicht mehr zeilenweise sortiert: Koordinaten aus dem Raster
+    rows, cols = raster.state_rows, raster.state_cols
+
+    # Manhattan-Distanz mal billigster Schritt ist zulässig (Bottlenecks kosten nur mehr)
+    h_scale = float(np.min(cost[np.isfinite(cost)])) if use_heuristic and np.isfinite(cost).any() else 0.0
+    gr, gc = goal
+
+    dist = np.full(T.shape[0], np.inf)
+    parent = np.full(T.shape[0], -1, dtype=np.int64)
+    dist[s0] = 0.0
+    heap = [(h_scale * (abs(rows[s0] - gr) + abs(cols[s0] - gc)), 0.0, s0)]
+    closed = np.zeros(T.shape[0], dtype=bool)
+
+    while heap:
+        _f, d, s = heapq.heappop(heap)
+        if closed[s]:
+            continue
+        closed[s] = True
+        if s == sg:
+            break
+        for a in range(T.shape[1]):
+            c = cost[s, a]
+            if c == np.inf:
+                continue
+            v = int(T[s, a])
+            nd = d + c
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = s
+                h = h_scale * (abs(rows[v] - gr) + abs(cols[v] - gc))
+                heapq.heappush(heap, (nd + h, nd, v))
+
+    if not np.isfinite(dist[sg]):
+        return [], float("inf")
+
+    path = [sg]
+    while path[-1] != s0:
+        path.append(int(parent[path[-1]]))
+    path.reverse()
+    return [(int(rows[s]), int(cols[s])) for s in path], float(dist[sg])
+
+
+def cost_to_go(
+    grid: GridMap,
+    goal: Coord,
+    step_cost: float = -1.0,
+    bottleneck_base_penalty: float = -6.0,
+) -> np.ndarray:
+    """
+    One-to-all mode: reverse Dijkstra from the goal.
+    Returns a [rows, cols] grid with the optimal cost from every cell to the goal (inf for walls/unreachable).
+    """
+    raster, T, cost = _edge_costs(grid, step_cost, bottleneck_base_penalty)
+    sg = _state_id(raster, goal)
+    n_actions = T.shape[1]
+
+    dist = np.full(T.shape[0], np.inf)
+    dist[sg] = 0.0
+    heap = [(0.0, sg)]
+    closed = np.zeros(T.shape[0], dtype=bool)
+
+    while heap:
+        d, v = heapq.heappop(heap)
+        if closed[v]:
+            continue
+        closed[v] = True
+        # Vorgänger u von v: Nachbar über Aktion a, zurück nach v über die Gegenrichtung
+        for a in range(n_actions):
+            if cost[v, a] == np.inf:
+                continue
+            u = int(T[v, a])
+            c = cost[u, (a + 2) % n_actions]
+            nd = d + c
+            if nd < dist[u]:
+                dist[u] = nd
+                heapq.heappush(heap, (nd, u))
+
+    out = np.full(raster.cells.shape, np.inf)
+    out[raster.state_rows, raster.state_cols] = dist
+    return out
+
+
+def path_cost(
+    grid: GridMap,
+    path: List[Coord],
+    step_cost: float = -1.0,
+    bottleneck_base_penalty: float = -6.0,
+) -> float:
+    """Cost of a coordinate path (e.g. from greedy_rollout) under the same model; inf if it is not walkable."""
+    # Zellen ausserhalb der Karte sind nicht begehbar (auch die Startzelle)
+    if any(not (0 <= r < grid.rows and 0 <= c < grid.cols) for r, c in path):
+        return float("inf")
+    total = 0.0
+    for (r0, c0), (r1, c1) in zip(path[:-1], path[1:]):
+        if (r1 - r0, c1 - c0) not in DELTAS.values() or (r1, c1) in grid.walls:
+            return float("inf")
+        total += -(step_cost + bottleneck_base_penalty * grid.bottlenecks.get((r1, c1), 0))
+    return total
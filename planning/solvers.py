@@ -0,0 +1,135 @@
+# planning/solvers.py
+import warnings
+
+import numpy as np
+
+from q_learning.agent import QLearningAgent
+
+
+def _backup(V, T, R, mask, gamma):
+    """Q[s, a] = R[s, a] + gamma * V[T[s, a]] on valid actions, 0 elsewhere (like an untouched Q-table)."""
+    return np.where(mask, R + gamma * V[T], 0.0)
+
+
+def _state_values(Q, mask, goal):
+    V = np.where(mask, Q, -np.inf).max(axis=1)
+    V[~np.isfinite(V)] = 0.0
+    # Ziel ist terminal: Episode endet dort, kein Bootstrap
+    V[goal] = 0.0
+    return V
+
+
+def _reaches_goal(T, mask, goal):
+    """Bool per state: goal reachable over valid actions (reverse BFS over T, one gather per level)."""
+    n_states = T.shape[0]
+    src = np.nonzero(mask)[0]
+    dst = T[mask]
+    order = np.argsort(dst, kind="stable")
+    src = src[order]
+    indptr = np.searchsorted(dst[order], np.arange(n_states + 1))
+
+    reach = np.zeros(n_states, dtype=bool)
+    reach[goal] = True
+    frontier = np.array([goal])
+    while len(frontier):
+        # Alle Vorgänger der Front auf einmal: CSR-Abschnitte indptr[v]:indptr[v + 1] aneinanderhängen
+        starts = indptr[frontier]
+        lens = indptr[frontier + 1] - starts
+        idx = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        preds = np.unique(src[idx])
+        frontier = preds[~reach[preds]]
+        reach[frontier] = True
+    return reach
+
+
+def greedy_policy(Q, mask):
+    """Greedy action per state over valid actions (first maximum, like QLearningAgent.predict_action)."""
+    return np.argmax(np.where(mask, Q, -np.inf), axis=1)
+
+
+def value_iteration(T, R, mask, goal, gamma=0.75, tol=1e-8, max_iter=10_000):
+    """
+    Vectorized value iteration on the env tables; returns the optimal Q-table like QLearningAgent.Q.
+    Warns if max_iter is reached; with gamma == 1, states that cannot reach the goal stay at V = 0.
+    """
+    R_valid = np.where(mask, R, -np.inf)
+    fixed = ~mask.any(axis=1)
+    if gamma >= 1.0:
+        fixed |= ~_reaches_goal(T, mask, goal)
+    V = np.zeros(T.shape[0], dtype=float)
+    Q = np.empty(T.shape, dtype=float)
+    for _ in range(max_iter):
+        np.multiply(V[T], gamma, out=Q)
+        Q += R_valid
+        V_new = Q.max(axis=1)
+        V_new[fixed] = 0.0
+        V_new[goal] = 0.0
+        delta = np.max(np.abs(V_new - V))
+        V = V_new
+        if delta < tol:
+            break
+    else:
+        warnings.warn(f"value_iteration: keine Konvergenz nach {max_iter} Iterationen (Delta {delta:.3g}).",
+                      RuntimeWarning, stacklevel=2)
+    return _backup(V, T, R, mask, gamma)
+
+
+def evaluate_policy(policy, T, R, goal, gamma=0.75, tol=1e-8):
+    """
+    Evaluates a deterministic policy[s] by pointer doubling over the successor function
+    (O(n_states * log(horizon))); returns V[n_states].
+    """
+    if not 0.0 <= gamma <= 1.0:
+        raise ValueError(f"gamma muss in [0, 1] liegen (ist {gamma}).")
+    states = np.arange(T.shape[0])
+    succ = T[states, policy]
+    acc = R[states, policy].astype(float)
+    # Ziel absorbierend mit Reward 0
+    succ[goal] = goal
+    acc[goal] = 0.0
+
+    scale = max(1.0, float(np.max(np.abs(acc))) / max(1e-12, 1.0 - gamma))
+    discount = gamma
+    # Ohne Diskontierung konvergiert discount nicht: Horizont auf 2 * n_states Schritte begrenzen
+    max_rounds = int(np.ceil(np.log2(max(2, T.shape[0])))) + 1 if gamma >= 1.0 else None
+    rounds = 0
+    while True:
+        acc = acc + discount * acc[succ]
+        succ = succ[succ]
+        discount = discount * discount
+        rounds += 1
+        if discount * scale < tol or rounds == max_rounds:
+            break
+    return acc
+
+
+def policy_iteration(T, R, mask, goal, gamma=0.75, tol=1e-8, max_iter=1_000):
+    """
+    Policy iteration (iterative evaluation + greedy improvement) on the env tables.
+    Returns the Q-table of the final policy, shape [n_states, n_actions].
+    """
+    policy = greedy_policy(np.zeros(T.shape, dtype=float), mask)
+    Q = np.zeros(T.shape, dtype=float)
+    for _ in range(max_iter):
+        V = evaluate_policy(policy, T, R, goal, gamma=gamma, tol=tol)
+        Q = _backup(V, T, R, mask, gamma)
+        new_policy = greedy_policy(Q, mask)
+        new_policy[goal] = policy[goal]
+        if np.array_equal(new_policy, policy):
+            break
+        policy = new_policy
+    return Q
+
+
+def policy_gap(Q, Q_opt, T, R, mask, goal, start, gamma=0.75):
+    """Optimal value minus the value of Q's greedy policy at `start` (0 = optimal)."""
+    V_opt = _state_values(Q_opt, mask, goal)
+    V_pi = evaluate_policy(greedy_policy(Q, mask), T, R, goal, gamma=gamma)
+    return float(V_opt[start] - V_pi[start])
+
+
+def as_agent(Q, gamma=0.75):
+    """Wraps a planned Q-table into a greedy QLearningAgent (for greedy_rollout / ValuePolicyPanel)."""
+    agent = QLearningAgent(Q.shape[0], Q.shape[1], gamma=gamma, epsilon_start=0.0, epsilon_min=0.0)
+    agent.Q = Q
+    return agent
@@ -1,11 +1,32 @@
 # q_learning/agent.py
+import json
+import os
+
 import numpy as np
 
-class QLearningAgent:
-    def __init__(self, n_states, n_actions,
-                 alpha=0.9, gamma=0.75,
-                 epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995):
-        self.Q = np.zeros((n_states, n_actions), dtype=float)
+
+def policy_and_value(Q, mask):
+    """
+    Greedy action and value of every state at once (masked argmax/max over the whole table).
+    States without a valid action get value NaN and action -1.
+    """
+    q = np.where(mask, Q, -np.inf)
+    actions = np.argmax(q, axis=1)
+    values = np.take_along_axis(q, actions[:, None], axis=1)[:, 0].astype(float)
+    has_valid = np.asarray(mask).any(axis=1)
+    values[~has_valid] = np.nan
+    actions[~has_valid] = -1
+    return values, actions
+
+
+class TabularAgent:
+    """
+    Shared base of the tabular agents: hyperparameters, epsilon schedule, epsilon-greedy
+    choose_action and save/load of self.Q. Subclasses take (n_rows, n_actions, **hyperparameters),
+    create self.Q and implement predict_action and update.
+    """
+
+    def __init__(self, alpha=0.9, gamma=0.75, epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995):
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon_start
@@ -20,6 +41,67 @@ class QLearningAgent:
             return int(np.random.choice(valid_actions))
         return self.predict_action(state, valid_actions)
 
+    def predict_action(self, state, valid_actions):
+        raise NotImplementedError
+
+    def update(self, s, a, r, s_next, valid_actions_next):
+        raise NotImplementedError
+
+    def start_episode(self):
+        """Hook called by training loops at the start of every episode (no-op here)."""
+
+    def decay_epsilon(self):
+        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+    def save(self, path):
+        """Writes <path>.npy (Q-table) and <path>.json (hyperparameters, epsilon)."""
+        if isinstance(self.Q, np.memmap) and os.path.abspath(self.Q.filename) == os.path.abspath(path + ".npy"):
+            self.Q.flush()
+        else:
+            np.save(path + ".npy", self.Q)
+        meta = dict(alpha=self.alpha, gamma=self.gamma, epsilon=self.epsilon,
+                    epsilon_min=self.epsilon_min, epsilon_decay=self.epsilon_decay)
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Loads an agent written by save(); mmap_mode="r"/"r+" maps the Q-table instead of reading it."""
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        Q = np.load(path + ".npy", mmap_mode=mmap_mode)
+        agent = cls(Q.shape[0], 0, alpha=meta["alpha"], gamma=meta["gamma"],
+                    epsilon_start=meta["epsilon"], epsilon_min=meta["epsilon_min"],
+                    epsilon_decay=meta["epsilon_decay"])
+        agent.Q = Q
+        return agent
+
+
+class QLearningAgent(TabularAgent):
+    def __init__(self, n_states, n_actions,
+                 alpha=0.9, gamma=0.75,
+                 epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995,
+                 dtype=float, q_path=None, replay_buffer=None, replay_batch_size=32):
+        super().__init__(alpha=alpha, gamma=gamma, epsilon_start=epsilon_start,
+                         epsilon_min=epsilon_min, epsilon_decay=epsilon_decay)
+        if q_path is not None:
+            # Q-Tabelle als np.memmap (.npy) auf Disk, für Tabellen grösser als der RAM;
+            # eine vorhandene Datei wird weiterverwendet statt überschrieben
+            if os.path.exists(q_path):
+                self.Q = np.lib.format.open_memmap(q_path, mode="r+")
+                if self.Q.shape != (n_states, n_actions) or self.Q.dtype != np.dtype(dtype):
+                    raise ValueError(
+                        f"{q_path} hat shape {self.Q.shape} / dtype {self.Q.dtype}, "
+                        f"erwartet {(n_states, n_actions)} / {np.dtype(dtype)}."
+                    )
+            else:
+                self.Q = np.lib.format.open_memmap(q_path, mode="w+", dtype=dtype, shape=(n_states, n_actions))
+        else:
+            self.Q = np.zeros((n_states, n_actions), dtype=dtype)
+        # Replay-Modus: update() legt Transitionen im Buffer ab und lernt zusätzlich aus Mini-Batches
+        self.replay_buffer = replay_buffer
+        self.replay_batch_size = replay_batch_size
+
     def predict_action(self, state, valid_actions):
         """Greedy action unter valid_actions."""
         q_vals = self.Q[state, valid_actions]
@@ -33,5 +115,70 @@ class QLearningAgent:
         td_error = td_target - self.Q[s, a]
         self.Q[s, a] += self.alpha * td_error
 
-    def decay_epsilon(self):
-        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+        if self.replay_buffer is not None:
+            mask_next = np.zeros(self.Q.shape[1], dtype=bool)
+            mask_next[valid_actions_next] = True
+            self.replay_buffer.add(s, a, r, s_next, mask_next, False)
+            self.replay()
+        return td_error
+
+    def replay(self, batch_size=None):
+        """
+        One mini-batch update from replay_buffer, weighted by the buffer's importance-sampling
+        weights (prioritized buffers get the new TD errors); returns them.
+        """
+        buf = self.replay_buffer
+        if batch_size is None:
+            batch_size = self.replay_batch_size
+        if buf is None or len(buf) < batch_size:
+            return None
+        idx, s, a, r, s_next, mask_next, done, weights = buf.sample(batch_size)
+        td_error = self.update_batch(s, a, r, s_next, mask_next, done, weights=weights)
+        if buf.prioritized:
+            buf.update_priorities(idx, td_error)
+        return td_error
+
+    def policy_and_value_grids(self, env):
+        """Value and greedy-action grids [rows, cols] on a GridWorldEnv (NaN / -1 for walls)."""
+        values, actions = policy_and_value(self.Q, env.mask)
+        return env.to_grid(values, np.nan), env.to_grid(actions, -1)
+
+    def choose_actions(self, states, masks):
+        """Batched epsilon-greedy: states (N,), masks (N, n_actions) bool -> actions (N,)."""
+        masks = np.asarray(masks, dtype=bool)
+        actions = self.predict_actions(states, masks)
+        explore = np.random.rand(len(actions)) < self.epsilon
+        if np.any(explore):
+            # Uniform unter den gültigen Aktionen: zufällige Keys, ungültige auf -1
+            keys = np.random.rand(int(explore.sum()), masks.shape[1])
+            keys[~masks[explore]] = -1.0
+            actions[explore] = np.argmax(keys, axis=1)
+        # Zeilen ohne gültige Aktion liefern 0 (wie choose_action)
+        return actions
+
+    def predict_actions(self, states, masks):
+        """Batched greedy action via masked argmax (first maximum, like predict_action)."""
+        q_vals = np.where(masks, self.Q[states], -np.inf)
+        return np.argmax(q_vals, axis=1)
+
+    def update_batch(self, s, a, r, s_next, mask_next, done, weights=None):
+        """
+        Batched TD update over arrays of transitions. `done` marks terminal transitions
+        (no bootstrap); pass False for time-limit truncation to match `update`.
+        Duplicate (s, a) pairs in one batch are averaged into a single step instead of
+        overwriting each other. `weights` (e.g. importance-sampling weights from a
+        prioritized ReplayBuffer) scale each transition's step. Returns the unweighted TD errors.
+        """
+        s = np.asarray(s)
+        a = np.asarray(a)
+        q_next = np.where(mask_next, self.Q[s_next], -np.inf).max(axis=1)
+        best_next = np.where(np.isfinite(q_next) & ~np.asarray(done, dtype=bool), q_next, 0.0)
+        td_error = r + self.gamma * best_next - self.Q[s, a]
+
+        flat = s * self.Q.shape[1] + a
+        keys, inverse = np.unique(flat, return_inverse=True)
+        td_sum = np.zeros(len(keys))
+        np.add.at(td_sum, inverse, td_error if weights is None else weights * td_error)
+        counts = np.bincount(inverse, minlength=len(keys))
+        self.Q.reshape(-1)[keys] += self.alpha * td_sum / counts
+        return td_error
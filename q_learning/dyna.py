@@ -0,0 +1,95 @@
+# q_learning/dyna.py
+import heapq
+
+import numpy as np
+
+from q_learning.agent import QLearningAgent
+
+
+class DynaQAgent(QLearningAgent):
+    """
+    Dyna-Q agent (deterministic model, n_planning backups per real step); prioritized=True orders
+    the backups by |TD error| and queues predecessors (prioritized sweeping).
+    """
+
+    def __init__(self, n_states, n_actions,
+                 alpha=0.9, gamma=0.75,
+                 epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995,
+                 n_planning=10, prioritized=True, theta=1e-4, dtype=float):
+        super().__init__(n_states, n_actions, alpha=alpha, gamma=gamma,
+                         epsilon_start=epsilon_start, epsilon_min=epsilon_min,
+                         epsilon_decay=epsilon_decay, dtype=dtype)
+        self.n_planning = n_planning
+        self.prioritized = prioritized
+        self.theta = theta
+
+        # Gelerntes Modell: -1 = (s, a) noch nie beobachtet
+        self.model_next = np.full((n_states, n_actions), -1, dtype=np.int64)
+        self.model_reward = np.zeros((n_states, n_actions), dtype=float)
+        self.known_valid = {}      # state -> valid actions (as seen by the env)
+        self.predecessors = {}     # state -> set of (s, a) leading into it
+        self._observed = []        # observed (s, a) for uniform Dyna sampling
+        self._queue = []           # max-heap via negative priority
+        self._queued = {}          # (s, a) -> priority currently in the heap
+
+    def choose_action(self, state, valid_actions):
+        if state not in self.known_valid:
+            self.known_valid[state] = [int(a) for a in valid_actions]
+        return super().choose_action(state, valid_actions)
+
+    def _best_next(self, s_next):
+        # Skalare Python-Arithmetik: im Planungsloop deutlich schneller als Fancy-Indexing
+        valid = self.known_valid.get(s_next)
+        if not valid:
+            return 0.0
+        q = self.Q[s_next].tolist()
+        return max(q[a] for a in valid)
+
+    def _td_error(self, s, a):
+        r = self.model_reward[s, a]
+        return r + self.gamma * self._best_next(int(self.model_next[s, a])) - self.Q[s, a]
+
+    def _queue_predecessors(self, s):
+        for sp, ap in self.predecessors.get(s, ()):
+            priority = abs(self._td_error(sp, ap))
+            if priority > self.theta and priority > self._queued.get((sp, ap), 0.0):
+                self._queued[(sp, ap)] = priority
+                heapq.heappush(self._queue, (-priority, sp, ap))
+
+    def update(self, s, a, r, s_next, valid_actions_next):
+        if s_next not in self.known_valid:
+            self.known_valid[s_next] = [int(x) for x in valid_actions_next]
+        if self.model_next[s, a] < 0:
+            self._observed.append((s, a))
+        self.model_next[s, a] = s_next
+        self.model_reward[s, a] = r
+        self.predecessors.setdefault(s_next, set()).add((s, a))
+
+        td_error = super().update(s, a, r, s_next, valid_actions_next)
+        if self.prioritized:
+            self._queue_predecessors(s)
+        self.plan()
+        return td_error
+
+    def plan(self, n=None):
+        """Runs n (default n_planning) model backups."""
+        n = self.n_planning if n is None else n
+        for _ in range(n):
+            if self.prioritized:
+                s = a = None
+                while self._queue:
+                    prio, s, a = heapq.heappop(self._queue)
+                    # Veraltete Einträge (inzwischen höher priorisiert) überspringen
+                    if self._queued.get((s, a)) == -prio:
+                        del self._queued[(s, a)]
+                        break
+                    s = None
+                if s is None:
+                    break
+            else:
+                if not self._observed:
+                    break
+                s, a = self._observed[np.random.randint(len(self._observed))]
+            self.Q[s, a] += self.alpha * self._td_error(s, a)
+            if self.prioritized:
+                self._queue_predecessors(s)
@@ -0,0 +1,34 @@
+# q_learning/edge_agent.py
+import numpy as np
+
+from q_learning.agent import TabularAgent
+
+
+class EdgeQLearningAgent(TabularAgent):
+    """
+    Q-learning with one Q-value per graph edge (Q has shape [n_edges]) for GraphWarehouseEnv,
+    where an action is a global edge id. Same update rule as QLearningAgent; every call
+    only touches the edge slices it is given, so the cost is O(degree).
+    n_actions is ignored (kept so TabularAgent.load works unchanged).
+    Greedy policies come from GraphWarehouseEnv.greedy_edges / greedy_path.
+    """
+
+    def __init__(self, n_edges, n_actions=None,
+                 alpha=0.9, gamma=0.75,
+                 epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995,
+                 dtype=float):
+        super().__init__(alpha=alpha, gamma=gamma, epsilon_start=epsilon_start,
+                         epsilon_min=epsilon_min, epsilon_decay=epsilon_decay)
+        self.Q = np.zeros(n_edges, dtype=dtype)
+
+    def predict_action(self, state, valid_actions):
+        """Greedy edge unter valid_actions."""
+        return int(valid_actions[int(np.argmax(self.Q[valid_actions]))])
+
+    def update(self, s, a, r, s_next, valid_actions_next):
+        best_next = 0.0
+        if len(valid_actions_next) > 0:
+            best_next = np.max(self.Q[valid_actions_next])
+        td_error = r + self.gamma * best_next - self.Q[a]
+        self.Q[a] += self.alpha * td_error
+        return td_error
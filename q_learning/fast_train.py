@@ -0,0 +1,275 @@
+# q_learning/fast_train.py
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from q_learning.metrics import EPISODE_SCHEMA, episode_stats
+
+# numba ist optional; ohne numba läuft derselbe Kernel interpretiert (Python-Schleife pro Schritt, deutlich langsamer)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+DEFAULT_HYPERPARAMS = dict(
+    alpha=0.9,
+    gamma=0.75,
+    epsilon_start=1.0,
+    epsilon_min=0.05,
+    epsilon_decay=0.995,
+    max_steps=200,
+)
+
+# Zufallszahlen werden blockweise vorab gezogen (2 pro Schritt), damit JIT-Kernel und
+# Fallback exakt dieselbe Sequenz verbrauchen.
+_UNIFORMS_PER_CHUNK = 1 << 20
+
+
+@dataclass
+class TrainResult:
+    Q: np.ndarray
+    epsilon: float
+    returns: np.ndarray
+    steps: np.ndarray
+    reached_goal: np.ndarray
+    bottleneck_hits: np.ndarray
+    bottleneck_level_sum: np.ndarray
+    epsilons: np.ndarray
+    mean_abs_td: np.ndarray
+    wall_time: np.ndarray
+
+    @classmethod
+    def from_stats(cls, Q, epsilon, stats, n_done=None):
+        """TrainResult from episode_stats arrays (first n_done episodes)."""
+        return cls(Q=Q, epsilon=float(epsilon), **{name: arr[:n_done] for name, arr in stats.items()})
+
+
+def _run_episodes(Q, T, R, valid, n_valid, levels, start, goal,
+                  alpha, gamma, epsilon, epsilon_min, epsilon_decay, max_steps, u,
+                  returns, steps, reached, bn_hits, bn_level_sum, epsilons, mean_abs_td, touched):
+    """
+    Epsilon-greedy Q-learning over u.shape[0] episodes; writes per-episode stats, marks
+    updated rows in touched[s] and returns epsilon.
+    """
+    for ep in range(u.shape[0]):
+        s = start
+        total_r = 0.0
+        td_sum = 0.0
+        hits = 0
+        level_sum = 0
+        n_steps = 0
+        done = False
+        for t in range(max_steps):
+            n = n_valid[s]
+            if n == 0:
+                a = 0
+            elif u[ep, t, 0] < epsilon:
+                a = valid[s, int(u[ep, t, 1] * n)]
+            else:
+                a = valid[s, 0]
+                for i in range(1, n):
+                    if Q[s, valid[s, i]] > Q[s, a]:
+                        a = valid[s, i]
+
+            s_next = T[s, a]
+            r = R[s, a]
+
+            best_next = 0.0
+            m = n_valid[s_next]
+            if m > 0:
+                best_next = Q[s_next, valid[s_next, 0]]
+                for i in range(1, m):
+                    if Q[s_next, valid[s_next, i]] > best_next:
+                        best_next = Q[s_next, valid[s_next, i]]
+            td = r + gamma * best_next - Q[s, a]
+            Q[s, a] += alpha * td
+            touched[s] = True
+            td_sum += abs(td)
+
+            total_r += r
+            lvl = levels[s, a]
+            if lvl > 0:
+                hits += 1
+                level_sum += lvl
+            s = s_next
+            n_steps = t + 1
+            if s == goal:
+                done = True
+                break
+
+        returns[ep] = total_r
+        steps[ep] = n_steps
+        reached[ep] = done
+        bn_hits[ep] = hits
+        bn_level_sum[ep] = level_sum
+        epsilons[ep] = epsilon
+        mean_abs_td[ep] = td_sum / n_steps if n_steps > 0 else 0.0
+        epsilon = max(epsilon_min, epsilon * epsilon_decay)
+    return epsilon
+
+
+_run_episodes_jit = njit(cache=True, nogil=True)(_run_episodes) if njit is not None else None
+
+
+def _open_stats_file(path, n_episodes, resume):
+    """Per-episode stats next to the checkpoint (<path>.stats.npy, one record per episode)."""
+    if resume:
+        return np.lib.format.open_memmap(path + ".stats.npy", mode="r+")
+    dtype = np.dtype([(name, dtype) for name, dtype in EPISODE_SCHEMA.items()])
+    return np.lib.format.open_memmap(path + ".stats.npy", mode="w+", dtype=dtype, shape=(n_episodes,))
+
+
+def _save_checkpoint(path, Q, epsilon, episode, rng, meta, stats, stats_file, saved):
+    """Appends stats[saved:episode] to the stats file, then writes Q/RNG/epsilon atomically (temp file + rename)."""
+    for name, arr in stats.items():
+        stats_file[name][saved:episode] = arr[saved:episode]
+    stats_file.flush()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            Q=Q,
+            epsilon=epsilon,
+            episode=episode,
+            rng_state=json.dumps(rng.bit_generator.state),
+            meta=json.dumps(meta),
+        )
+    os.replace(tmp, path)
+
+
+def _load_checkpoint(path, Q, rng, meta, stats, stats_file):
+    """Restores Q (in place), RNG state and stats; returns (epsilon, episode). ValueError for another run."""
+    with np.load(path) as ckpt:
+        saved = json.loads(str(ckpt["meta"]))
+        mismatch = {key: (saved.get(key), value) for key, value in meta.items() if saved.get(key) != value}
+        if mismatch:
+            details = ", ".join(f"{key}: {old} != {new}" for key, (old, new) in mismatch.items())
+            raise ValueError(f"Checkpoint {path} passt nicht zu diesem Lauf ({details}).")
+        np.copyto(Q, ckpt["Q"])
+        episode = int(ckpt["episode"])
+        for name, arr in stats.items():
+            arr[:episode] = stats_file[name][:episode]
+        rng.bit_generator.state = json.loads(str(ckpt["rng_state"]))
+        return float(ckpt["epsilon"]), episode
+
+
+def fast_train(T, R, mask, start, goal, hyperparams=None, n_episodes=1000, seed=42,
+               levels=None, Q=None, use_jit=None, checkpoint_path=None, checkpoint_every=10_000,
+               progress=None, progress_every=100, metrics=None):
+    """
+    Epsilon-greedy Q-learning on precomputed tables (T next state, R reward, mask valid action),
+    same update rule as QLearningAgent; trains `Q` in place and is reproducible from `seed`.
+    Resumes from / saves to `checkpoint_path`; `progress(n_done, Q, returns)` returning False stops early.
+    """
+    hp = dict(DEFAULT_HYPERPARAMS)
+    if hyperparams:
+        hp.update(hyperparams)
+    max_steps = int(hp["max_steps"])
+
+    T = np.ascontiguousarray(T, dtype=np.int64)
+    R = np.ascontiguousarray(R, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool)
+    n_states, n_actions = T.shape
+    if Q is None:
+        Q = np.zeros((n_states, n_actions), dtype=float)
+    if levels is None:
+        levels = np.zeros((n_states, n_actions), dtype=np.int64)
+    levels = np.ascontiguousarray(levels, dtype=np.int64)
+    # float32/float64 (auch np.memmap) werden direkt trainiert; float16 (Speicherformat) braucht
+    # eine float32-Arbeitskopie, in die Tabelle werden pro Block nur die geänderten Zeilen zurückgeschrieben
+    work_Q = Q if Q.dtype in (np.float32, np.float64) else Q.astype(np.float32)
+    touched = np.zeros(n_states, dtype=bool)
+
+    # Gültige Aktionen je Zustand aufsteigend vorne, Rest aufgefüllt
+    valid = np.ascontiguousarray(np.argsort(~mask, axis=1, kind="stable"), dtype=np.int64)
+    n_valid = mask.sum(axis=1).astype(np.int64)
+
+    if use_jit is None:
+        use_jit = _run_episodes_jit is not None
+    kernel = _run_episodes_jit if use_jit else _run_episodes
+
+    episode = episode_stats(n_episodes)
+    returns, steps, reached = episode["returns"], episode["steps"], episode["reached_goal"]
+    bn_hits, bn_level_sum = episode["bottleneck_hits"], episode["bottleneck_level_sum"]
+    epsilons, mean_abs_td, wall_time = episode["epsilons"], episode["mean_abs_td"], episode["wall_time"]
+
+    rng = np.random.default_rng(seed)
+    epsilon = float(hp["epsilon_start"])
+    first = 0
+    meta = dict(q_shape=[n_states, n_actions], q_dtype=str(Q.dtype), n_episodes=int(n_episodes),
+                seed=None if seed is None else int(seed))
+    # Vorhandener Checkpoint muss zu Q-Shape/-Dtype, n_episodes und seed passen; der fortgesetzte
+    # Lauf endet bit-identisch zu einem ununterbrochenen
+    if checkpoint_path is not None:
+        resume = os.path.exists(checkpoint_path)
+        stats_file = _open_stats_file(checkpoint_path, n_episodes, resume)
+        if resume:
+            epsilon, first = _load_checkpoint(checkpoint_path, work_Q, rng, meta, episode, stats_file)
+            if work_Q is not Q:
+                Q[...] = work_Q
+    if metrics is not None:
+        metrics.bind(episode, first)
+
+    # Blockgrösse ändert die Zufallsfolge nicht (Generator liefert einen fortlaufenden Strom);
+    # Blöcke enden zusätzlich auf Vielfachen von checkpoint_every / progress_every
+    chunk = max(1, _UNIFORMS_PER_CHUNK // (2 * max(1, max_steps)))
+    progress_every = max(1, progress_every)
+    boundaries = [every for every, on in ((checkpoint_every, checkpoint_path), (progress_every, progress))
+                  if on is not None]
+    n_done = n_episodes
+    saved = first
+    t0 = time.perf_counter() - (wall_time[first - 1] if first > 0 else 0.0)
+    lo = first
+    while lo < n_episodes:
+        hi = min([n_episodes, lo + chunk] + [(lo // every + 1) * every for every in boundaries])
+        u = rng.random((hi - lo, max_steps, 2))
+        epsilon = kernel(
+            work_Q, T, R, valid, n_valid, levels, int(start), int(goal),
+            float(hp["alpha"]), float(hp["gamma"]), epsilon,
+            float(hp["epsilon_min"]), float(hp["epsilon_decay"]), max_steps, u,
+            returns[lo:hi], steps[lo:hi], reached[lo:hi], bn_hits[lo:hi], bn_level_sum[lo:hi],
+            epsilons[lo:hi], mean_abs_td[lo:hi], touched,
+        )
+        wall_time[lo:hi] = time.perf_counter() - t0
+        if metrics is not None:
+            metrics.update(hi)
+        if work_Q is not Q:
+            rows = np.flatnonzero(touched)
+            Q[rows] = work_Q[rows]
+            touched[rows] = False
+        stop = progress is not None and (hi % progress_every == 0 or hi == n_episodes) and \
+            progress(hi, work_Q, returns[:hi]) is False
+        if checkpoint_path is not None and (hi % checkpoint_every == 0 or hi == n_episodes or stop):
+            _save_checkpoint(checkpoint_path, work_Q, epsilon, hi, rng, meta, episode, stats_file, saved)
+            saved = hi
+        if stop:
+            n_done = hi
+            break
+        lo = hi
+
+    if metrics is not None:
+        metrics.close(n_done)
+    return TrainResult.from_stats(Q, epsilon, episode, n_done)
+
+
+def fast_train_agent(agent, T, R, mask, start, goal, n_episodes, max_steps, seed=42,
+                     levels=None, use_jit=None, checkpoint_path=None, checkpoint_every=10_000,
+                     progress=None, progress_every=100, metrics=None):
+    """fast_train with the hyperparameters of `agent`; trains agent.Q in place and syncs epsilon."""
+    hyperparams = dict(
+        alpha=agent.alpha,
+        gamma=agent.gamma,
+        epsilon_start=agent.epsilon,
+        epsilon_min=agent.epsilon_min,
+        epsilon_decay=agent.epsilon_decay,
+        max_steps=max_steps,
+    )
+    result = fast_train(T, R, mask, start, goal, hyperparams=hyperparams, n_episodes=n_episodes,
+                        seed=seed, levels=levels, Q=agent.Q, use_jit=use_jit,
+                        checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every,
+                        progress=progress, progress_every=progress_every, metrics=metrics)
+    agent.epsilon = result.epsilon
+    return result
@@ -0,0 +1,149 @@
+# q_learning/goal_conditioned.py
+import time
+
+import numpy as np
+
+from q_learning.agent import QLearningAgent
+from q_learning.fast_train import TrainResult
+from q_learning.metrics import episode_stats
+
+
+class GoalConditionedAgent:
+    """
+    Goal-conditioned Q-learning Q[goal, state, action] on one map, every trajectory relabeled
+    with all `goals` (hindsight). goals="all" needs n_states^2 * n_actions entries: small maps only.
+    """
+
+    def __init__(self, env, goals,
+                 alpha=0.5, gamma=0.9,
+                 epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995,
+                 dtype=np.float32):
+        self.env = env
+        self.T = env.T
+        self.R_base = env.R_base
+        self.mask = env.mask
+        self.goal_reward = env.goal_reward
+
+        # Zielzustände; Q hat eine Zeile pro Ziel ("all": alle Zellen, quadratischer Speicher)
+        if isinstance(goals, str) and goals == "all":
+            self.goals = np.arange(env.n_states)
+        else:
+            self.goals = np.asarray([env.coord_to_state[g] for g in goals], dtype=np.int64)
+        if len(self.goals) == 0:
+            raise ValueError("GoalConditionedAgent braucht mindestens ein Ziel.")
+        self.goal_slot = np.full(env.n_states, -1, dtype=np.int64)
+        self.goal_slot[self.goals] = np.arange(len(self.goals))
+
+        self.Q = np.zeros((len(self.goals), env.n_states, env.n_actions), dtype=dtype)
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon_start
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+
+    def _greedy(self, slot, s):
+        q = np.where(self.mask[s], self.Q[slot, s], -np.inf)
+        return int(np.argmax(q))
+
+    def _relabel_update(self, states, actions, next_states):
+        """
+        All-goals TD update for one trajectory, applied backwards so credit flows in one pass.
+        Returns the summed mean |TD error| over goals.
+        """
+        goals = self.goals
+        td_sum = 0.0
+        for s, a, s_next in zip(states[::-1], actions[::-1], next_states[::-1]):
+            moved = self.mask[s, a]
+            reached = moved & (s_next == goals)
+            r = self.R_base[s, a] + self.goal_reward * reached
+            q_next = np.where(self.mask[s_next], self.Q[:, s_next], -np.inf).max(axis=1)
+            q_next[~np.isfinite(q_next) | reached] = 0.0
+            td_error = r + self.gamma * q_next - self.Q[:, s, a]
+            # Für Ziele, in denen s schon liegt, wäre die Episode beendet
+            td_error[goals == s] = 0.0
+            self.Q[:, s, a] += self.alpha * td_error
+            td_sum += np.abs(td_error).mean()
+        return td_sum
+
+    def train(self, n_episodes=1000, max_steps=200, seed=42, metrics=None):
+        """
+        Epsilon-greedy episodes with random start/goal pairs. Returns a TrainResult (returns/steps
+        w.r.t. the sampled goal, mean_abs_td over all relabeled goals); `metrics` as in train_agent.
+        """
+        rng = np.random.default_rng(seed)
+        free = np.arange(self.env.n_states)
+        stats = episode_stats(n_episodes)
+        reached = stats["reached_goal"]
+        if metrics is not None:
+            metrics.bind(stats)
+        t0 = time.perf_counter()
+
+        for ep in range(n_episodes):
+            slot = int(rng.integers(len(self.goals)))
+            goal = self.goals[slot]
+            s = int(rng.choice(free))
+            stats["epsilons"][ep] = self.epsilon
+            states, actions, next_states = [], [], []
+            for _ in range(max_steps):
+                if s == goal:
+                    reached[ep] = True
+                    break
+                valid = np.flatnonzero(self.mask[s])
+                if len(valid) == 0:
+                    break
+                if rng.random() < self.epsilon:
+                    a = int(rng.choice(valid))
+                else:
+                    a = self._greedy(slot, s)
+                s_next = int(self.T[s, a])
+                states.append(s)
+                actions.append(a)
+                next_states.append(s_next)
+                s = s_next
+            else:
+                reached[ep] = s == goal
+
+            if states:
+                states, actions, next_states = np.array(states), np.array(actions), np.array(next_states)
+                levels = self.env.L[states, actions]
+                stats["returns"][ep] = (self.R_base[states, actions].sum()
+                                        + self.goal_reward * np.any((next_states == goal) & self.mask[states, actions]))
+                stats["steps"][ep] = len(states)
+                stats["bottleneck_hits"][ep] = np.count_nonzero(levels)
+                stats["bottleneck_level_sum"][ep] = levels.sum()
+                stats["mean_abs_td"][ep] = self._relabel_update(states, actions, next_states) / len(states)
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+            stats["wall_time"][ep] = time.perf_counter() - t0
+            if metrics is not None:
+                metrics.update(ep + 1)
+
+        if metrics is not None:
+            metrics.close()
+        return TrainResult.from_stats(self.Q, self.epsilon, stats)
+
+    def greedy_path(self, start, goal, max_steps=None):
+        """Greedy route for any (start, goal) on the trained map, as a list of coords."""
+        slot = self.goal_slot[self.env.coord_to_state[goal]]
+        if slot < 0:
+            raise ValueError(f"{goal} ist kein trainiertes Ziel.")
+        if max_steps is None:
+            max_steps = self.env.n_states
+        s = self.env.coord_to_state[start]
+        g = self.goals[slot]
+        path = [self.env.state_to_coord[s]]
+        for _ in range(max_steps):
+            if s == g:
+                break
+            s = int(self.T[s, self._greedy(slot, s)])
+            path.append(self.env.state_to_coord[s])
+        return path
+
+    def agent_for_goal(self, goal):
+        """Greedy QLearningAgent view on Q[goal] (for greedy_rollout / ValuePolicyPanel)."""
+        slot = self.goal_slot[self.env.coord_to_state[goal]]
+        if slot < 0:
+            raise ValueError(f"{goal} ist kein trainiertes Ziel.")
+        agent = QLearningAgent(self.env.n_states, self.env.n_actions, alpha=self.alpha, gamma=self.gamma,
+                               epsilon_start=0.0, epsilon_min=0.0)
+        agent.Q = self.Q[slot]
+        return agent
@@ -0,0 +1,128 @@
+# q_learning/loop.py
+import time
+
+import numpy as np
+
+from q_learning.fast_train import TrainResult
+from q_learning.metrics import episode_stats
+
+
+def train_agent(env, agent, num_episodes=1000, max_steps=200, seed=None, metrics=None):
+    """
+    Classic step-by-step training loop (env.valid_actions / agent.choose_action / agent.update).
+    Used for agent variants that have no compiled kernel (see fast_train for plain Q-learning).
+    Returns a TrainResult with the same per-episode stats as fast_train_agent;
+    `metrics` (MetricsRecorder) is updated after every episode.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    stats = episode_stats(num_episodes)
+    returns, steps, reached = stats["returns"], stats["steps"], stats["reached_goal"]
+    bn_hits, bn_level_sum = stats["bottleneck_hits"], stats["bottleneck_level_sum"]
+    if metrics is not None:
+        metrics.bind(stats)
+    t0 = time.perf_counter()
+
+    for ep in range(num_episodes):
+        s = env.reset()
+        agent.start_episode()
+        stats["epsilons"][ep] = agent.epsilon
+        total_r = 0.0
+        td_sum = 0.0
+        for t in range(max_steps):
+            a = agent.choose_action(s, env.valid_actions(s))
+            s_next, r, done, info = env.step(a)
+            total_r += r
+            level = info.get("bottleneck_level", 0)
+            if level > 0:
+                bn_hits[ep] += 1
+                bn_level_sum[ep] += level
+            td_sum += abs(agent.update(s, a, r, s_next, env.valid_actions(s_next)))
+            s = s_next
+            steps[ep] = t + 1
+            if done:
+                reached[ep] = s == env.goal_state
+                break
+        agent.decay_epsilon()
+        returns[ep] = total_r
+        stats["mean_abs_td"][ep] = td_sum / max(1, steps[ep])
+        stats["wall_time"][ep] = time.perf_counter() - t0
+        if metrics is not None:
+            metrics.update(ep + 1)
+
+    if metrics is not None:
+        metrics.close()
+    return TrainResult.from_stats(agent.Q, agent.epsilon, stats)
+
+
+def train_fleet(env, agents, num_episodes=1000, seed=None, metrics=None):
+    """
+    Training loop for FleetGridWorldEnv. `agents` is either one agent whose Q-table is shared by
+    the whole fleet (batched choose_actions / update_batch over all active agents per step) or a
+    list with one independent agent per robot (per-agent choose_action / update).
+    Per-episode stats are summed over the fleet (mean_abs_td averages over all agent steps);
+    reached_goal means all agents arrived.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    shared = not isinstance(agents, (list, tuple))
+    pool = [agents] if shared else list(agents)
+    if not shared and len(pool) != env.n_agents:
+        raise ValueError("Es braucht genau einen Agenten pro Roboter.")
+    stats = episode_stats(num_episodes)
+    returns, steps, reached = stats["returns"], stats["steps"], stats["reached_goal"]
+    bn_hits, bn_level_sum = stats["bottleneck_hits"], stats["bottleneck_level_sum"]
+    if metrics is not None:
+        metrics.bind(stats)
+    t0 = time.perf_counter()
+
+    for ep in range(num_episodes):
+        states = env.reset()
+        for agent in pool:
+            agent.start_episode()
+        stats["epsilons"][ep] = pool[0].epsilon
+        arrived = np.zeros(env.n_agents, dtype=bool)
+        total_r = 0.0
+        td_sum = 0.0
+        n_updates = 0
+        for t in range(env.max_steps):
+            on = env.active
+            if shared:
+                actions = agents.choose_actions(states, env.valid_masks(states))
+            else:
+                actions = np.zeros(env.n_agents, dtype=np.int64)
+                for k in np.flatnonzero(on):
+                    actions[k] = pool[k].choose_action(states[k], env.mask[states[k]].nonzero()[0])
+            s_next, r, done, info = env.step(actions)
+            total_r += r.sum()
+            level = info["bottleneck_level"]
+            bn_hits[ep] += np.count_nonzero(level)
+            bn_level_sum[ep] += level.sum()
+            arrived |= info["reached_goal"]
+
+            if shared:
+                td = agents.update_batch(states[on], actions[on], r[on], s_next[on],
+                                         env.mask[s_next[on]], info["reached_goal"][on])
+                td_sum += np.abs(td).sum()
+            else:
+                for k in np.flatnonzero(on):
+                    td_sum += abs(pool[k].update(states[k], actions[k], r[k], s_next[k],
+                                                 env.mask[s_next[k]].nonzero()[0]))
+            n_updates += int(on.sum())
+            states = s_next
+            steps[ep] = t + 1
+            if done.all():
+                break
+        for agent in pool:
+            agent.decay_epsilon()
+        returns[ep] = total_r
+        reached[ep] = arrived.all()
+        stats["mean_abs_td"][ep] = td_sum / max(1, n_updates)
+        stats["wall_time"][ep] = time.perf_counter() - t0
+        if metrics is not None:
+            metrics.update(ep + 1)
+
+    if metrics is not None:
+        metrics.close()
+    Q = agents.Q if shared else np.stack([agent.Q for agent in pool])
+    return TrainResult.from_stats(Q, pool[0].epsilon, stats)
@@ -0,0 +1,152 @@
+# q_learning/metrics.py
+import json
+import os
+
+import numpy as np
+
+# Gemeinsames Schema aller Trainingsschleifen: Spaltenname -> dtype (eine Zeile pro Episode)
+EPISODE_SCHEMA = dict(
+    returns=np.float64,
+    steps=np.int64,
+    reached_goal=bool,
+    bottleneck_hits=np.int64,
+    bottleneck_level_sum=np.int64,
+    epsilons=np.float64,
+    mean_abs_td=np.float64,
+    wall_time=np.float64,
+)
+
+
+def episode_stats(n_episodes):
+    """Preallocated per-episode arrays for EPISODE_SCHEMA (mean_abs_td NaN until written)."""
+    stats = {name: np.zeros(n_episodes, dtype=dtype) for name, dtype in EPISODE_SCHEMA.items()}
+    stats["mean_abs_td"][:] = np.nan
+    return stats
+
+
+class CSVSink:
+    """Appends metric rows to a CSV file (header on the first write; floats round-trip exactly)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._header = not os.path.exists(path) or os.path.getsize(path) == 0
+
+    def write(self, columns):
+        names = list(columns)
+        table = np.column_stack([np.asarray(columns[name], dtype=float) for name in names])
+        fmt = ["%d" if np.asarray(columns[name]).dtype.kind in "biu" else "%.17g" for name in names]
+        with open(self.path, "a", encoding="utf-8") as f:
+            if self._header:
+                f.write(",".join(names) + "\n")
+                self._header = False
+            np.savetxt(f, table, fmt=fmt, delimiter=",")
+
+    def close(self):
+        pass
+
+
+class JSONLSink:
+    """Appends one JSON object per metric row."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, columns):
+        names = list(columns)
+        rows = zip(*(np.asarray(columns[name]).tolist() for name in names))
+        with open(self.path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(names, row))) + "\n")
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    """Writes metric rows as Parquet row groups (needs pyarrow)."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError("ParquetSink braucht pyarrow (pip install pyarrow).") from exc
+        self.path = path
+        self._writer = None
+
+    def write(self, columns):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: np.asarray(values) for name, values in columns.items()})
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+SINKS = {".csv": CSVSink, ".jsonl": JSONLSink, ".parquet": ParquetSink}
+
+
+def open_sink(path):
+    """Sink by file extension (.csv, .jsonl, .parquet)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SINKS:
+        raise ValueError(f"Unbekanntes Metrik-Format '{ext}' (erlaubt: {', '.join(SINKS)}).")
+    return SINKS[ext](path)
+
+
+class MetricsRecorder:
+    """
+    Shared instrumentation for the training loops. A loop fills the preallocated
+    episode_stats arrays and calls update(n_done) after every episode (or chunk of episodes);
+    the recorder keeps every sample_every-th episode and streams those rows to `sink` in
+    blocks of flush_every rows, so the per-episode cost is one comparison.
+    Rows carry an `episode` column plus EPISODE_SCHEMA (wall_time: seconds since training start).
+    """
+
+    def __init__(self, sink=None, sample_every=1, flush_every=1000):
+        if isinstance(sink, str):
+            sink = open_sink(sink)
+        self.sink = sink
+        self.sample_every = max(1, int(sample_every))
+        self.flush_every = max(1, int(flush_every))
+        self.stats = None
+        self.n_done = 0
+        self._flushed = 0
+
+    def bind(self, stats, first=0):
+        """Starts recording into `stats` (resumed runs pass the first new episode)."""
+        self.stats = stats
+        self.n_done = first
+        self._flushed = first
+
+    def update(self, n_done):
+        self.n_done = n_done
+        if self.sink is not None and n_done - self._flushed >= self.flush_every * self.sample_every:
+            self.flush()
+
+    def _sampled(self, lo, hi):
+        first = lo + (-lo) % self.sample_every
+        return np.arange(first, hi, self.sample_every)
+
+    def flush(self):
+        episodes = self._sampled(self._flushed, self.n_done)
+        if self.sink is not None and len(episodes):
+            self.sink.write(dict(episode=episodes, **{name: arr[episodes] for name, arr in self.stats.items()}))
+        self._flushed = self.n_done
+
+    def close(self, n_done=None):
+        if n_done is not None:
+            self.n_done = n_done
+        self.flush()
+        if self.sink is not None:
+            self.sink.close()
+
+    def columns(self):
+        """Sampled rows recorded so far as {name: array}, including `episode`."""
+        episodes = self._sampled(0, self.n_done)
+        return dict(episode=episodes, **{name: arr[episodes] for name, arr in self.stats.items()})
@@ -0,0 +1,242 @@
+# q_learning/parallel.py
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from q_learning.fast_train import TrainResult
+from q_learning.metrics import episode_stats
+
+# numba ist optional; ohne numba läuft der Rollout-Kernel interpretiert
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _rollout(Q, local_Q, has_local, copied, T, R, valid, n_valid, levels, start, goal,
+             alpha, gamma, eps_start, eps_min, eps_decay, max_steps, episodes, u, pos, stats,
+             b_s, b_a, b_r, b_s_next, b_done):
+    """
+    One actor round on the transition tables: up to len(b_s) epsilon-greedy steps, written to the
+    batch arrays; returns the number of steps. pos = [episode, state (-1 = new episode), t].
+    """
+    n_copied = 0
+    k = 0
+    while k < b_s.shape[0] and pos[0] < episodes.shape[0]:
+        k_ep = pos[0]
+        if pos[1] < 0:
+            pos[1] = start
+            pos[2] = 0
+        s = pos[1]
+        epsilon = max(eps_min, eps_start * eps_decay ** episodes[k_ep])
+
+        # Zeilen werden beim ersten Lesen in local_Q kopiert: Q ist während der Runde eingefroren,
+        # der lokale TD-Schritt lässt das Verhalten trotzdem auf eigene Erfahrung reagieren
+        if not has_local[s]:
+            local_Q[s] = Q[s]
+            has_local[s] = True
+            copied[n_copied] = s
+            n_copied += 1
+        n = n_valid[s]
+        if n == 0:
+            a = 0
+        elif u[k, 0] < epsilon:
+            a = valid[s, int(u[k, 1] * n)]
+        else:
+            a = valid[s, 0]
+            for i in range(1, n):
+                if local_Q[s, valid[s, i]] > local_Q[s, a]:
+                    a = valid[s, i]
+        s_next = T[s, a]
+        r = R[s, a]
+        if not has_local[s_next]:
+            local_Q[s_next] = Q[s_next]
+            has_local[s_next] = True
+            copied[n_copied] = s_next
+            n_copied += 1
+        reached = s_next == goal
+
+        best_next = 0.0
+        m = n_valid[s_next]
+        if not reached and m > 0:
+            best_next = local_Q[s_next, valid[s_next, 0]]
+            for i in range(1, m):
+                if local_Q[s_next, valid[s_next, i]] > best_next:
+                    best_next = local_Q[s_next, valid[s_next, i]]
+        td = r + gamma * best_next - local_Q[s, a]
+        local_Q[s, a] += alpha * td
+
+        b_s[k], b_a[k], b_r[k], b_s_next[k], b_done[k] = s, a, r, s_next, reached
+        k += 1
+        pos[2] += 1
+        # Spalten: return, steps, reached, bottleneck_hits, bottleneck_level_sum, |TD|-Summe, wall_time
+        stats[k_ep, 0] += r
+        stats[k_ep, 1] = pos[2]
+        stats[k_ep, 5] += abs(td)
+        if levels[s, a] > 0:
+            stats[k_ep, 3] += 1
+            stats[k_ep, 4] += levels[s, a]
+        if reached or pos[2] >= max_steps:
+            stats[k_ep, 2] = reached
+            pos[0] += 1
+            pos[1] = -1
+        else:
+            pos[1] = s_next
+
+    for i in range(n_copied):
+        has_local[copied[i]] = False
+    return k
+
+
+_rollout_jit = njit(cache=True, nogil=True)(_rollout) if njit is not None else None
+
+
+def _worker(wid, tables, shm_name, q_shape, q_dtype, episodes, max_steps, sync_interval,
+            eps_params, seed_seq, t0, use_jit, conn):
+    """
+    Actor: plays its share of the episodes with the _rollout kernel on the shared Q and sends
+    one batch of up to sync_interval transitions per round, then waits for the learner.
+    wall_time is measured from the learner's start time t0 (time.time(), shared by all processes).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        Q = np.ndarray(q_shape, dtype=q_dtype, buffer=shm.buf)
+        T, R, valid, n_valid, levels, start, goal = tables
+        rng = np.random.default_rng(seed_seq)
+        eps_start, eps_min, eps_decay, alpha, gamma = eps_params
+        kernel = _rollout_jit if use_jit else _rollout
+
+        local_Q = np.zeros(q_shape, dtype=np.float64)
+        has_local = np.zeros(q_shape[0], dtype=bool)
+        copied = np.zeros(2 * sync_interval, dtype=np.int64)
+        pos = np.array([0, -1, 0], dtype=np.int64)
+        stats = np.zeros((len(episodes), 7))
+        b_s = np.zeros(sync_interval, dtype=np.int32)
+        b_a = np.zeros(sync_interval, dtype=np.int32)
+        b_r = np.zeros(sync_interval, dtype=np.float32)
+        b_s_next = np.zeros(sync_interval, dtype=np.int32)
+        b_done = np.zeros(sync_interval, dtype=bool)
+
+        while True:
+            n_before = pos[0]
+            u = rng.random((sync_interval, 2))
+            k = kernel(Q, local_Q, has_local, copied, T, R, valid, n_valid, levels, start, goal,
+                       alpha, gamma, eps_start, eps_min, eps_decay, max_steps, episodes, u, pos, stats,
+                       b_s, b_a, b_r, b_s_next, b_done)
+            stats[n_before:pos[0], 6] = time.time() - t0
+            finished = pos[0] == len(episodes)
+            batch = (b_s[:k].copy(), b_a[:k].copy(), b_r[:k].copy(), b_s_next[:k].copy(), b_done[:k].copy())
+            conn.send((batch, finished, stats if finished else None))
+            if finished:
+                break
+            conn.recv()
+    finally:
+        shm.close()
+
+
+def parallel_train(env, agent, n_episodes=1000, max_steps=200, n_workers=None,
+                   sync_interval=64, seed=42, mp_context=None, metrics=None, use_jit=None):
+    """
+    Actor/learner training: n_workers processes roll out episodes on env's tables against a shared-memory
+    Q, the caller applies their batches with agent.update_batch in synchronous rounds of sync_interval
+    steps. Reproducible for fixed (seed, n_workers, sync_interval); returns a TrainResult.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if use_jit is None:
+        use_jit = _rollout_jit is not None
+    ctx = mp.get_context(mp_context)
+
+    # Gültige Aktionen je Zustand aufsteigend vorne (wie in fast_train)
+    mask = np.asarray(env.mask, dtype=bool)
+    tables = (
+        np.ascontiguousarray(env.T, dtype=np.int64),
+        np.ascontiguousarray(env.R, dtype=np.float64),
+        np.ascontiguousarray(np.argsort(~mask, axis=1, kind="stable"), dtype=np.int64),
+        mask.sum(axis=1).astype(np.int64),
+        np.ascontiguousarray(env.L, dtype=np.int64),
+        int(env.coord_to_state[env.start]),
+        int(env.goal_state),
+    )
+
+    # Worker w spielt die Episoden w, w + n_workers, ... (epsilon nach globalem Episodenindex);
+    # Statistiken kommen erst am Ende eines Workers, metrics wird deshalb am Schluss geschrieben
+    episode_sets = [np.arange(w, n_episodes, n_workers) for w in range(n_workers)]
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    eps_params = (agent.epsilon, agent.epsilon_min, agent.epsilon_decay, agent.alpha, agent.gamma)
+
+    episode = episode_stats(n_episodes)
+    episode["epsilons"][:] = np.maximum(agent.epsilon_min, agent.epsilon * agent.epsilon_decay ** np.arange(n_episodes))
+    if metrics is not None:
+        metrics.bind(episode)
+
+    # Gemeinsamer Startzeitpunkt für alle Worker: perf_counter hat keinen prozessübergreifenden Bezugspunkt
+    t0 = time.time()
+    local_Q = agent.Q
+    shm = shared_memory.SharedMemory(create=True, size=max(1, local_Q.nbytes))
+    procs = []
+    try:
+        shared_Q = np.ndarray(local_Q.shape, dtype=local_Q.dtype, buffer=shm.buf)
+        shared_Q[...] = local_Q
+        agent.Q = shared_Q
+
+        # Eine Pipe pro Worker statt Queues: kein Feeder-Thread, geringere Latenz pro Runde
+        conns = []
+        for w in range(n_workers):
+            conn, child_conn = ctx.Pipe()
+            p = ctx.Process(target=_worker, daemon=True, args=(
+                w, tables, shm.name, local_Q.shape, local_Q.dtype, episode_sets[w], max_steps,
+                sync_interval, eps_params, seeds[w], t0, use_jit, child_conn))
+            p.start()
+            child_conn.close()
+            procs.append(p)
+            conns.append(conn)
+
+        active = set(range(n_workers))
+        while active:
+            batches = {}
+            for wid in sorted(active):
+                try:
+                    batch, finished, stats = conns[wid].recv()
+                except EOFError:
+                    raise RuntimeError("Ein Rollout-Worker ist abgestürzt.") from None
+                batches[wid] = (batch, finished)
+                if finished:
+                    ep = episode_sets[wid]
+                    episode["returns"][ep] = stats[:, 0]
+                    episode["steps"][ep] = stats[:, 1]
+                    episode["reached_goal"][ep] = stats[:, 2].astype(bool)
+                    episode["bottleneck_hits"][ep] = stats[:, 3]
+                    episode["bottleneck_level_sum"][ep] = stats[:, 4]
+                    episode["mean_abs_td"][ep] = stats[:, 5] / np.maximum(1, stats[:, 1])
+                    episode["wall_time"][ep] = stats[:, 6]
+
+            # Feste Reihenfolge -> deterministisches Q unabhängig vom Scheduling
+            for wid in sorted(batches):
+                (s, a, r, s_next, done), finished = batches[wid]
+                if len(s):
+                    agent.update_batch(s.astype(np.int64), a.astype(np.int64), r, s_next,
+                                       env.mask[s_next], done)
+                if finished:
+                    active.discard(wid)
+            for wid in active:
+                conns[wid].send(True)
+
+        for p in procs:
+            p.join()
+        local_Q[...] = shared_Q
+    finally:
+        agent.Q = local_Q
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        shm.close()
+        shm.unlink()
+
+    agent.epsilon = max(agent.epsilon_min, agent.epsilon * agent.epsilon_decay ** n_episodes)
+    if metrics is not None:
+        metrics.close(n_episodes)
+    return TrainResult.from_stats(agent.Q, agent.epsilon, episode)
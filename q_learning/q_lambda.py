@@ -0,0 +1,85 @@
+# q_learning/q_lambda.py
+import numpy as np
+
+from q_learning.agent import QLearningAgent
+
+
+class QLambdaAgent(QLearningAgent):
+    """
+    Watkins Q(lambda) with replacing eligibility traces; same interface as QLearningAgent.
+    Traces live in sparse active-index arrays (state, action, value) instead of a dense
+    [n_states, n_actions] matrix, so every update costs O(active traces): traces below
+    trace_min are pruned, and an exploratory action or a new episode clears them.
+    """
+
+    def __init__(self, n_states, n_actions,
+                 alpha=0.9, gamma=0.75,
+                 epsilon_start=1.0, epsilon_min=0.05, epsilon_decay=0.995,
+                 lam=0.9, trace_min=1e-4, dtype=float):
+        super().__init__(n_states, n_actions, alpha=alpha, gamma=gamma,
+                         epsilon_start=epsilon_start, epsilon_min=epsilon_min,
+                         epsilon_decay=epsilon_decay, dtype=dtype)
+        self.lam = lam
+        self.trace_min = trace_min
+
+        capacity = 64
+        self._tr_s = np.zeros(capacity, dtype=np.int64)
+        self._tr_a = np.zeros(capacity, dtype=np.int64)
+        self._tr_e = np.zeros(capacity, dtype=float)
+        self._n = 0
+        self._slot = {}  # (s, a) -> index in the trace arrays
+
+    @property
+    def trace_length(self):
+        return self._n
+
+    def reset_traces(self):
+        self._n = 0
+        self._slot.clear()
+
+    def start_episode(self):
+        self.reset_traces()
+
+    def choose_action(self, state, valid_actions):
+        a = super().choose_action(state, valid_actions)
+        # Watkins: nach einer explorativen (nicht-greedy) Aktion werden die Traces gekappt
+        if len(valid_actions) > 0 and a != self.predict_action(state, valid_actions):
+            self.reset_traces()
+        return a
+
+    def _add_trace(self, s, a):
+        slot = self._slot.get((s, a))
+        if slot is None:
+            if self._n == len(self._tr_e):
+                self._tr_s = np.concatenate([self._tr_s, np.zeros_like(self._tr_s)])
+                self._tr_a = np.concatenate([self._tr_a, np.zeros_like(self._tr_a)])
+                self._tr_e = np.concatenate([self._tr_e, np.zeros_like(self._tr_e)])
+            slot = self._n
+            self._n += 1
+            self._slot[(s, a)] = slot
+            self._tr_s[slot] = s
+            self._tr_a[slot] = a
+        # Replacing traces
+        self._tr_e[slot] = 1.0
+
+    def update(self, s, a, r, s_next, valid_actions_next):
+        best_next = 0.0
+        if len(valid_actions_next) > 0:
+            best_next = np.max(self.Q[s_next, valid_actions_next])
+        td_error = r + self.gamma * best_next - self.Q[s, a]
+
+        self._add_trace(s, a)
+        n = self._n
+        # (s, a) sind im Trace eindeutig -> Fancy-Index-Update ohne Kollisionen
+        self.Q[self._tr_s[:n], self._tr_a[:n]] += self.alpha * td_error * self._tr_e[:n]
+        self._tr_e[:n] *= self.gamma * self.lam
+
+        keep = self._tr_e[:n] >= self.trace_min
+        if not keep.all():
+            m = int(keep.sum())
+            self._tr_s[:m] = self._tr_s[:n][keep]
+            self._tr_a[:m] = self._tr_a[:n][keep]
+            self._tr_e[:m] = self._tr_e[:n][keep]
+            self._n = m
+            self._slot = {(int(ts), int(ta)): i for i, (ts, ta) in enumerate(zip(self._tr_s[:m], self._tr_a[:m]))}
+        return td_error
@@ -0,0 +1,144 @@
+# q_learning/replay.py
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions (structure of arrays), sampled uniformly or, with
+    prioritized=True, from a sum tree with importance-sampling weights.
+    """
+
+    def __init__(self, capacity, n_actions, prioritized=False, priority_exponent=0.6,
+                 priority_eps=1e-3, importance_exponent=0.4, seed=None):
+        self.capacity = int(capacity)
+        self.prioritized = prioritized
+        self.priority_exponent = priority_exponent
+        self.priority_eps = priority_eps
+        self.importance_exponent = importance_exponent
+        self.rng = np.random.default_rng(seed)
+
+        self.s = np.zeros(self.capacity, dtype=np.int32)
+        self.a = np.zeros(self.capacity, dtype=np.int32)
+        self.r = np.zeros(self.capacity, dtype=np.float32)
+        self.s_next = np.zeros(self.capacity, dtype=np.int32)
+        self.mask_next = np.zeros((self.capacity, n_actions), dtype=bool)
+        self.done = np.zeros(self.capacity, dtype=bool)
+        self.priority = np.zeros(self.capacity, dtype=np.float64)
+
+        self._pos = 0
+        self._size = 0
+        self._max_priority = 1.0
+
+        # Summen-/Minimum-Baum über priority**exponent: Blätter ab _leaf, Knoten i hat Kinder 2i, 2i+1
+        self._leaf = 1 << max(0, (self.capacity - 1).bit_length())
+        if prioritized:
+            self._sum_tree = np.zeros(2 * self._leaf, dtype=np.float64)
+            self._min_tree = np.full(2 * self._leaf, np.inf, dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    def _set_priority(self, i, p):
+        """Scalar tree update (add() runs once per environment step)."""
+        self.priority[i] = p
+        node = self._leaf + i
+        value = p ** self.priority_exponent
+        self._sum_tree[node] = value
+        self._min_tree[node] = value
+        sum_tree, min_tree = self._sum_tree, self._min_tree
+        node //= 2
+        while node >= 1:
+            sum_tree[node] = sum_tree[2 * node] + sum_tree[2 * node + 1]
+            min_tree[node] = min(min_tree[2 * node], min_tree[2 * node + 1])
+            node //= 2
+
+    def _set_priorities(self, idx, p):
+        """Vectorized tree update: one pass per tree level over the touched nodes."""
+        self.priority[idx] = p
+        nodes = self._leaf + np.asarray(idx, dtype=np.int64)
+        value = self.priority[idx] ** self.priority_exponent
+        self._sum_tree[nodes] = value
+        self._min_tree[nodes] = value
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            left, right = 2 * nodes, 2 * nodes + 1
+            self._sum_tree[nodes] = self._sum_tree[left] + self._sum_tree[right]
+            self._min_tree[nodes] = np.minimum(self._min_tree[left], self._min_tree[right])
+
+    def add(self, s, a, r, s_next, mask_next, done=False):
+        i = self._pos
+        self.s[i] = s
+        self.a[i] = a
+        self.r[i] = r
+        self.s_next[i] = s_next
+        self.mask_next[i] = mask_next
+        self.done[i] = done
+        # Neue Transitionen mit maximaler Priorität, damit sie mindestens einmal gezogen werden
+        if self.prioritized:
+            self._set_priority(i, self._max_priority)
+        else:
+            self.priority[i] = self._max_priority
+        self._pos = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def add_batch(self, s, a, r, s_next, mask_next, done):
+        """Vectorized add, e.g. for the arrays returned by BatchGridWorldEnv.step."""
+        n = len(s)
+        if n > self.capacity:
+            # Nur die letzten `capacity` Transitionen überleben ohnehin
+            sl = slice(n - self.capacity, n)
+            s, a, r, s_next, mask_next, done = (np.asarray(x)[sl] for x in (s, a, r, s_next, mask_next, done))
+            n = self.capacity
+        idx = (self._pos + np.arange(n)) % self.capacity
+        self.s[idx] = s
+        self.a[idx] = a
+        self.r[idx] = r
+        self.s_next[idx] = s_next
+        self.mask_next[idx] = mask_next
+        self.done[idx] = done
+        if self.prioritized:
+            self._set_priorities(idx, self._max_priority)
+        else:
+            self.priority[idx] = self._max_priority
+        self._pos = int((self._pos + n) % self.capacity)
+        self._size = min(self._size + n, self.capacity)
+
+    def _descend(self, u):
+        """Leaf index per target mass u (vectorized walk from the root, one step per level)."""
+        tree = self._sum_tree
+        nodes = np.ones(len(u), dtype=np.int64)
+        while nodes[0] < self._leaf:
+            left = tree[2 * nodes]
+            # Rundungsfehler dürfen nicht in einen leeren rechten Teilbaum führen
+            right = (u >= left) & (tree[2 * nodes + 1] > 0)
+            u = np.where(right, u - left, u)
+            nodes = 2 * nodes + right
+        return nodes - self._leaf
+
+    def sample(self, batch_size):
+        """
+        Returns (idx, s, a, r, s_next, mask_next, done, weights) for batch_size transitions
+        (with replacement); weights are the importance-sampling weights (all 1 when uniform).
+        """
+        if self._size == 0:
+            raise ValueError("ReplayBuffer ist leer.")
+        if self.prioritized:
+            total = self._sum_tree[1]
+            idx = np.minimum(self._descend(self.rng.random(batch_size) * total), self._size - 1)
+            # w_i = (N * P(i))^-beta / max_j w_j; max_j w_j gehört zur kleinsten Priorität
+            probs = self._sum_tree[self._leaf + idx] / total
+            p_min = self._min_tree[1] / total
+            weights = (probs / p_min) ** -self.importance_exponent
+        else:
+            idx = self.rng.integers(self._size, size=batch_size)
+            weights = np.ones(batch_size)
+        return (idx, self.s[idx], self.a[idx], self.r[idx], self.s_next[idx], self.mask_next[idx],
+                self.done[idx], weights)
+
+    def update_priorities(self, idx, td_errors):
+        p = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.priority_eps
+        if self.prioritized:
+            self._set_priorities(idx, p)
+        else:
+            self.priority[idx] = p
+        self._max_priority = max(self._max_priority, float(p.max(initial=0.0)))
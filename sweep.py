@@ -0,0 +1,166 @@
+# sweep.py
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from train_grid import train_grid
+
+
+def grid_configs(space):
+    """Full factorial grid: {"alpha": [0.1, 0.5], ...} -> list of config dicts."""
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_configs(space, n_samples, seed=0):
+    """Random samples: lists are sampled uniformly as choices, (low, high) tuples as uniform floats."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_samples):
+        config = {}
+        for key in sorted(space):
+            values = space[key]
+            if isinstance(values, tuple):
+                config[key] = float(rng.uniform(values[0], values[1]))
+            else:
+                config[key] = values[int(rng.integers(len(values)))]
+        configs.append(config)
+    return configs
+
+
+def latin_hypercube_configs(bounds, n_samples, seed=0):
+    """Latin hypercube samples over {"alpha": (low, high), ...}: every dimension is stratified into n_samples bins."""
+    rng = np.random.default_rng(seed)
+    keys = sorted(bounds)
+    # Je Dimension eine Permutation der Bins, plus Jitter innerhalb des Bins
+    bins = np.stack([rng.permutation(n_samples) for _ in keys], axis=1)
+    u = (bins + rng.random((n_samples, len(keys)))) / n_samples
+    low = np.array([bounds[k][0] for k in keys], dtype=float)
+    high = np.array([bounds[k][1] for k in keys], dtype=float)
+    samples = low + u * (high - low)
+    return [dict(zip(keys, map(float, row))) for row in samples]
+
+
+def config_id(config):
+    """Stable content hash of a config (basis of run ids and run seeds)."""
+    blob = json.dumps(config, sort_keys=True, default=list)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def run_seed(base_seed, config):
+    """Deterministic per-run seed: depends only on base_seed and the config, not on scheduling order."""
+    ss = np.random.SeedSequence([base_seed, int(config_id(config), 16)])
+    return int(ss.generate_state(1)[0])
+
+
+def run_id(config, seed):
+    """Run id for resuming: config hash plus the run seed, so another base_seed gives new runs."""
+    return f"{config_id(config)}-{seed}"
+
+
+def summarize(metrics, window=100):
+    returns = np.asarray(metrics["episode_returns"], dtype=float)
+    reached = np.asarray(metrics["reached_goal_flags"], dtype=float)
+    steps = np.asarray(metrics["steps_to_goal"], dtype=float)
+    hits = np.asarray(metrics["bottleneck_hits"], dtype=float)
+    tail = slice(-window, None)
+    return {
+        "mean_return": float(returns.mean()),
+        "final_mean_return": float(returns[tail].mean()),
+        "final_success_rate": float(reached[tail].mean()),
+        "final_mean_steps": float(steps[tail].mean()),
+        "final_mean_bottleneck_hits": float(hits[tail].mean()),
+        "final_epsilon": float(metrics["final_epsilon"]),
+    }
+
+
+def _run_one(config, seed, window):
+    # JSON liefert Listen zurück, train_grid erwartet Koordinaten als Tupel
+    kwargs = {k: tuple(v) if isinstance(v, list) else v for k, v in config.items()}
+    _env, _agent, metrics = train_grid(seed=seed, **kwargs)
+    return summarize(metrics, window=window)
+
+
+def _truncate_partial_line(results_path):
+    """Cuts off an unterminated last line (interrupted write), so the next append starts on a new line."""
+    if not os.path.exists(results_path):
+        return
+    with open(results_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def load_results(results_path):
+    if not os.path.exists(results_path):
+        return []
+    records = []
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Abgebrochener Schreibvorgang (letzte Zeile) -> Run wird wiederholt
+                continue
+    return records
+
+
+def run_sweep(configs, results_path, base_seed=0, max_workers=None, window=100):
+    """
+    Runs train_grid per config in a process pool and appends one JSON line per run to `results_path`;
+    runs already in the file are skipped on resume, failed runs are recorded with "error" and retried.
+    """
+    records = [rec for rec in load_results(results_path) if "error" not in rec]
+    done = {rec["run_id"] for rec in records}
+
+    pending = []
+    for config in configs:
+        seed = run_seed(base_seed, config)
+        rid = run_id(config, seed)
+        if rid not in done:
+            done.add(rid)
+            pending.append((rid, config, seed))
+
+    if not pending:
+        return records
+
+    _truncate_partial_line(results_path)
+    with open(results_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for rid, config, seed in pending:
+            futures[executor.submit(_run_one, config, seed, window)] = (rid, config, seed)
+
+        for future in as_completed(futures):
+            rid, config, seed = futures[future]
+            record = {"run_id": rid, "seed": seed, "params": config}
+            # Ein fehlgeschlagener Run bricht den Sweep nicht ab, die übrigen Ergebnisse bleiben erhalten
+            try:
+                record["summary"] = future.result()
+            except Exception as exc:
+                record["error"] = f"{type(exc).__name__}: {exc}"
+            out.write(json.dumps(record, default=list) + "\n")
+            out.flush()
+            records.append(record)
+
+    return records
+
+
+if __name__ == "__main__":
+    configs = grid_configs({
+        "alpha": [0.1, 0.5, 0.9],
+        "gamma": [0.75, 0.9, 0.99],
+        "eps_decay": [0.99, 0.995],
+    })
+    results = run_sweep(configs, "sweep_results.jsonl", base_seed=42)
+    finished = [rec for rec in results if "summary" in rec]
+    best = max(finished, key=lambda rec: rec["summary"]["final_mean_return"])
+    print(f"Runs: {len(finished)} ({len(results) - len(finished)} fehlgeschlagen)")
+    print("Best params:", best["params"], "->", best["summary"])
@@ -0,0 +1,31 @@
+# tests/test_agent.py
+import numpy as np
+
+from q_learning.agent import QLearningAgent
+
+
+def test_update_batch_averages_duplicate_pairs():
+    agent = QLearningAgent(3, 2, alpha=0.5, gamma=0.0)
+    s = np.array([0, 0, 1])
+    a = np.array([1, 1, 0])
+    r = np.array([1.0, 3.0, 2.0])
+    mask_next = np.ones((3, 2), dtype=bool)
+    td = agent.update_batch(s, a, r, np.array([1, 1, 2]), mask_next, np.ones(3, dtype=bool))
+    # Doppeltes (0, 1): ein Schritt mit dem mittleren TD-Fehler statt Überschreiben
+    assert agent.Q[0, 1] == 0.5 * 2.0
+    assert agent.Q[1, 0] == 0.5 * 2.0
+    np.testing.assert_array_equal(td, r)
+    assert np.count_nonzero(agent.Q) == 2
+
+
+def test_update_batch_matches_sequential_updates_without_duplicates():
+    rng = np.random.default_rng(0)
+    batch, seq = QLearningAgent(20, 4, gamma=0.9), QLearningAgent(20, 4, gamma=0.9)
+    batch.Q[...] = seq.Q[...] = rng.normal(size=(20, 4))
+    s, a = np.arange(10), rng.integers(4, size=10)
+    r, s_next = rng.normal(size=10), rng.integers(10, 20, size=10)
+    mask_next = np.ones((10, 4), dtype=bool)
+    batch.update_batch(s, a, r, s_next, mask_next, np.zeros(10, dtype=bool))
+    for i in range(10):
+        seq.update(s[i], a[i], r[i], s_next[i], np.arange(4))
+    np.testing.assert_allclose(batch.Q, seq.Q)
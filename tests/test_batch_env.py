@@ -0,0 +1,46 @@
+# tests/test_batch_env.py
+import numpy as np
+import pytest
+
+from gridworld.batch_env import BatchGridWorldEnv
+from gridworld.env import GridWorldEnv
+from gridworld.maps import random_map
+
+
+def _grid():
+    return random_map(rows=8, cols=8, wall_ratio=0.15, bottleneck_ratio=0.15, seed=1)
+
+
+def test_matches_single_env_step_by_step():
+    grid = _grid()
+    starts, goal = [(0, 0), (0, 0), (7, 0)], (7, 7)
+    batch = BatchGridWorldEnv(grid, starts=starts, goals=goal, max_steps=30)
+    singles = [GridWorldEnv(grid=grid, start=start, goal=goal, max_steps=30) for start in starts]
+    states = batch.reset()
+    assert list(states) == [env.reset() for env in singles]
+
+    rng = np.random.default_rng(0)
+    done = np.zeros(len(starts), dtype=bool)
+    for _ in range(30):
+        actions = rng.integers(batch.n_actions, size=len(starts))
+        states, rewards, dones, info = batch.step(actions)
+        for i, env in enumerate(singles):
+            if done[i]:
+                # Beendete Envs bleiben eingefroren
+                assert rewards[i] == 0.0 and dones[i]
+                continue
+            s, r, d, single_info = env.step(int(actions[i]))
+            assert (states[i], rewards[i], dones[i]) == (s, r, d)
+            assert info["bottleneck_level"][i] == single_info["bottleneck_level"]
+        done = dones
+        if done.all():
+            break
+
+
+def test_step_rejects_out_of_range_actions():
+    batch = BatchGridWorldEnv(_grid(), starts=(0, 0), goals=(7, 7), num_envs=2)
+    batch.reset()
+    for bad in (-1, batch.n_actions):
+        with pytest.raises(ValueError, match="Ungültige Aktion"):
+            batch.step(np.array([0, bad]))
+    batch.step(np.array([0, batch.n_actions - 1]))
@@ -0,0 +1,16 @@
+# tests/test_cache.py
+import os
+
+from q_learning.agent import QLearningAgent
+from visualization.cache import PolicyCache
+
+
+def test_disk_entry_round_trip_leaves_no_temp_files(tmp_path):
+    agent = QLearningAgent(4, 4)
+    agent.Q[1, 2] = 3.0
+    PolicyCache(cache_dir=str(tmp_path)).put("k", agent, [1.0, 2.0], [(0, 0), (0, 1)], {"cost": 1.5})
+    assert sorted(os.listdir(tmp_path)) == ["k.json", "k.npy", "k.result.json"]
+
+    entry = PolicyCache(cache_dir=str(tmp_path)).get("k")
+    assert entry["agent"].Q[1, 2] == 3.0
+    assert entry["path"] == [(0, 0), (0, 1)] and entry["stats"] == {"cost": 1.5}
@@ -0,0 +1,30 @@
+# tests/test_corpus.py
+import numpy as np
+import pytest
+
+from gridworld.corpus import build_corpus, sample_start_goal
+from gridworld.raster import label_components
+
+
+def test_corpus_stores_component_labels(tmp_path):
+    corpus = build_corpus(str(tmp_path / "a"), n_maps=7, rows=6, cols=8, seed=3, shard_size=3, max_workers=1)
+    assert len(corpus) == 7
+    rasters = list(corpus)
+    for i, raster in enumerate(rasters):
+        # Labels kommen aus dem Shard, nicht aus einer Neuberechnung
+        assert raster._components is not None
+        np.testing.assert_array_equal(raster.components, label_components(raster.cells))
+        np.testing.assert_array_equal(corpus[i].cells, raster.cells)
+
+    # Map i hängt nur vom Seed ab, nicht von der Shard-Grösse
+    other = build_corpus(str(tmp_path / "b"), n_maps=7, rows=6, cols=8, seed=3, shard_size=5, max_workers=1)
+    for a, b in zip(rasters, other):
+        np.testing.assert_array_equal(a.cells, b.cells)
+
+    with pytest.raises(ValueError):
+        build_corpus(str(tmp_path / "a"), n_maps=7, rows=6, cols=8, seed=4, shard_size=3, max_workers=1)
+
+    rng = np.random.default_rng(0)
+    for raster in rasters:
+        start, goal = sample_start_goal(raster, rng)
+        assert raster.connected(start, goal)
@@ -0,0 +1,23 @@
+# tests/test_env.py
+import pytest
+
+from gridworld.env import GridWorldEnv
+from gridworld.maps import random_map
+
+
+def test_step_rejects_out_of_range_actions():
+    grid = random_map(rows=6, cols=6, wall_ratio=0.1, bottleneck_ratio=0.1, seed=0)
+    env = GridWorldEnv(grid=grid, start=(0, 0), goal=(5, 5))
+    env.reset()
+    for action in (-1, env.n_actions):
+        with pytest.raises(ValueError):
+            env.step(action)
+    env.step(env.n_actions - 1)
+
+
+def test_valid_actions_are_read_only():
+    grid = random_map(rows=6, cols=6, wall_ratio=0.1, bottleneck_ratio=0.1, seed=0)
+    env = GridWorldEnv(grid=grid, start=(0, 0), goal=(5, 5))
+    actions = env.valid_actions(env.reset())
+    with pytest.raises(ValueError):
+        actions[0] = 3
@@ -0,0 +1,76 @@
+# tests/test_fast_train.py
+import numpy as np
+import pytest
+
+from gridworld.env import GridWorldEnv
+from gridworld.maps import random_map
+from q_learning.agent import QLearningAgent
+from q_learning.fast_train import fast_train
+
+
+def _env():
+    grid = random_map(rows=10, cols=10, wall_ratio=0.15, bottleneck_ratio=0.1, seed=5)
+    return GridWorldEnv(grid=grid, start=(0, 0), goal=(9, 9))
+
+
+def _train(env, **kwargs):
+    return fast_train(env.T, env.R, env.mask, env.coord_to_state[env.start], env.goal_state,
+                      hyperparams=dict(max_steps=100), **kwargs)
+
+
+def test_float16_table_gets_all_updates():
+    env = _env()
+    Q16 = np.zeros(env.T.shape, dtype=np.float16)
+    _train(env, Q=Q16, n_episodes=300, seed=1, progress=lambda *_: True, progress_every=7)
+    # Zeilenweises Zurückschreiben muss dieselbe Tabelle liefern wie ein Training in float32
+    Q32 = np.zeros(env.T.shape, dtype=np.float32)
+    _train(env, Q=Q32, n_episodes=300, seed=1)
+    np.testing.assert_array_equal(Q16, Q32.astype(np.float16))
+
+
+def test_checkpoint_rejects_other_run(tmp_path):
+    env = _env()
+    ckpt = str(tmp_path / "run.npz")
+    _train(env, n_episodes=50, seed=1, checkpoint_path=ckpt, checkpoint_every=20)
+    with pytest.raises(ValueError, match="seed"):
+        _train(env, n_episodes=50, seed=2, checkpoint_path=ckpt)
+    with pytest.raises(ValueError, match="n_episodes"):
+        _train(env, n_episodes=80, seed=1, checkpoint_path=ckpt)
+    with pytest.raises(ValueError, match="q_dtype"):
+        _train(env, Q=np.zeros(env.T.shape, dtype=np.float32), n_episodes=50, seed=1, checkpoint_path=ckpt)
+
+
+def test_memmap_q_table_is_reopened(tmp_path):
+    env = _env()
+    q_path = str(tmp_path / "q.npy")
+    agent = QLearningAgent(env.n_states, env.n_actions, dtype=np.float32, q_path=q_path)
+    _train(env, Q=agent.Q, n_episodes=100, seed=1)
+    agent.Q.flush()
+    trained = np.array(agent.Q)
+    del agent
+
+    reopened = QLearningAgent(env.n_states, env.n_actions, dtype=np.float32, q_path=q_path)
+    np.testing.assert_array_equal(reopened.Q, trained)
+    with pytest.raises(ValueError):
+        QLearningAgent(env.n_states, env.n_actions, dtype=np.float64, q_path=q_path)
+
+
+def test_checkpoint_cadence_and_resume(tmp_path, monkeypatch):
+    import q_learning.fast_train as ft
+
+    env = _env()
+    ckpt = str(tmp_path / "run.npz")
+    saved = []
+    save = ft._save_checkpoint
+    monkeypatch.setattr(ft, "_save_checkpoint", lambda path, Q, eps, episode, *a: (saved.append(episode),
+                                                                                   save(path, Q, eps, episode, *a)))
+    # Abbruch nach 60 Episoden: gespeichert wird nur auf Vielfachen von checkpoint_every und beim Abbruch
+    _train(env, n_episodes=200, seed=3, checkpoint_path=ckpt, checkpoint_every=25,
+           progress=lambda n, *_: n < 60, progress_every=10)
+    assert saved == [25, 50, 60]
+    resumed = _train(env, n_episodes=200, seed=3, checkpoint_path=ckpt, checkpoint_every=25)
+    assert saved[3:] == [75, 100, 125, 150, 175, 200]
+
+    full = _train(env, n_episodes=200, seed=3)
+    np.testing.assert_array_equal(resumed.Q, full.Q)
+    np.testing.assert_array_equal(resumed.returns, full.returns)
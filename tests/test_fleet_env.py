@@ -0,0 +1,49 @@
+# tests/test_fleet_env.py
+import numpy as np
+import pytest
+
+from gridworld.fleet_env import FleetGridWorldEnv
+from gridworld.raster import GridRaster
+
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+
+
+def _step(starts, actions):
+    env = FleetGridWorldEnv(GridRaster(np.zeros((4, 4), dtype=np.uint8)), starts=starts, goals=(3, 3))
+    env.reset(seed=0)
+    states, rewards, _done, info = env.step(np.array(actions))
+    return [tuple(c) for c in env.states_to_coords(states)], rewards, info["blocked"], env
+
+
+def test_swap_is_blocked():
+    coords, rewards, blocked, env = _step([(0, 0), (0, 1)], [RIGHT, LEFT])
+    assert coords == [(0, 0), (0, 1)] and blocked.all()
+    assert np.all(rewards == env.step_cost + env.collision_penalty)
+
+
+def test_same_target_has_one_winner():
+    coords, _rewards, blocked, _env = _step([(0, 0), (0, 2)], [RIGHT, LEFT])
+    assert blocked.sum() == 1
+    assert coords.count((0, 1)) == 1
+
+
+def test_blocking_propagates_along_chain_to_standing_agent():
+    # C läuft gegen den Kartenrand und bleibt stehen, B und dann A werden blockiert
+    coords, _rewards, blocked, _env = _step([(0, 0), (0, 1), (0, 2)], [RIGHT, RIGHT, UP])
+    assert coords == [(0, 0), (0, 1), (0, 2)]
+    assert blocked.tolist() == [True, True, False]
+
+
+def test_train_and_rotation_move():
+    coords, _rewards, blocked, _env = _step([(0, 0), (0, 1)], [RIGHT, RIGHT])
+    assert coords == [(0, 1), (0, 2)] and not blocked.any()
+    coords, _rewards, blocked, _env = _step([(0, 0), (0, 1), (1, 1), (1, 0)], [RIGHT, DOWN, LEFT, UP])
+    assert coords == [(0, 1), (1, 1), (1, 0), (0, 0)] and not blocked.any()
+
+
+def test_step_rejects_out_of_range_actions():
+    env = FleetGridWorldEnv(GridRaster(np.zeros((4, 4), dtype=np.uint8)), starts=[(0, 0), (0, 1)], goals=(3, 3))
+    env.reset()
+    for bad in (-1, env.n_actions):
+        with pytest.raises(ValueError, match="Ungültige Aktion"):
+            env.step(np.array([RIGHT, bad]))
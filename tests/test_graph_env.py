@@ -0,0 +1,41 @@
+# tests/test_graph_env.py
+import numpy as np
+from q_learning.agent import QLearningAgent
+from q_learning.edge_agent import EdgeQLearningAgent
+from warehouse.graph_env import GraphWarehouseEnv, build_csr
+from warehouse.layout_io import GraphLayout, load_edge_list
+
+
+def test_default_goal_is_last_node_everywhere():
+    src, dst = np.arange(11), np.arange(1, 12)
+    R = np.zeros((12, 12))
+    R[src, dst] = R[dst, src] = 1.0
+    indptr, indices, costs = build_csr(12, src, dst, np.ones(11))
+    envs = [
+        GraphWarehouseEnv.from_edges(12, src, dst),
+        GraphWarehouseEnv.from_reward_matrix(R),
+        GraphLayout(indptr, indices, costs).to_env(),
+    ]
+    assert {env.goal_state for env in envs} == {11}
+
+
+def test_edge_agent_shares_only_the_tabular_base(tmp_path):
+    agent = EdgeQLearningAgent(10, epsilon_start=0.5)
+    assert not isinstance(agent, QLearningAgent)
+    assert not hasattr(agent, "update_batch")
+    agent.update(0, 3, 2.0, 1, np.array([4, 5]))
+    agent.decay_epsilon()
+    agent.save(str(tmp_path / "edge"))
+    loaded = EdgeQLearningAgent.load(str(tmp_path / "edge"))
+    np.testing.assert_array_equal(loaded.Q, agent.Q)
+    assert loaded.Q.shape == (10,) and loaded.epsilon == agent.epsilon
+
+
+def test_sparse_integer_ids_are_remapped(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("src,dst,cost\n1000000,5,2\n5,77,1\n")
+    for _ in range(2):  # zweiter Durchlauf liest den Cache
+        layout = load_edge_list(str(path), cache_dir=str(tmp_path / "cache"))
+        assert layout.n_nodes == 3
+        assert layout.node_id(1000000) == 2
+        assert layout.indices[layout.indptr[layout.node_id(5)]:layout.indptr[layout.node_id(5) + 1]].tolist() == [1, 2]
@@ -0,0 +1,20 @@
+# tests/test_parallel.py
+import numpy as np
+
+from gridworld.env import GridWorldEnv
+from gridworld.maps import random_map
+from q_learning.agent import QLearningAgent
+from q_learning.parallel import parallel_train
+
+
+def test_rollout_kernel_is_reproducible_with_and_without_jit():
+    grid = random_map(rows=8, cols=8, wall_ratio=0.15, bottleneck_ratio=0.1, seed=2)
+    env = GridWorldEnv(grid=grid, start=(0, 0), goal=(7, 7))
+    results = []
+    for use_jit in (None, False):
+        agent = QLearningAgent(env.n_states, env.n_actions, alpha=0.5, gamma=0.9)
+        results.append(parallel_train(env, agent, n_episodes=60, max_steps=100, n_workers=2,
+                                      sync_interval=16, seed=4, use_jit=use_jit))
+    np.testing.assert_array_equal(results[0].Q, results[1].Q)
+    np.testing.assert_array_equal(results[0].returns, results[1].returns)
+    assert results[0].reached_goal[-10:].any()
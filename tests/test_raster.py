@@ -0,0 +1,51 @@
+# tests/test_raster.py
+from collections import deque
+
+import numpy as np
+
+from gridworld.raster import WALL, GridRaster, label_components
+
+
+def _bfs_labels(cells):
+    """Reference: 4-connected components by breadth-first search."""
+    labels = np.full(cells.shape, -1, dtype=np.int64)
+    n = 0
+    for start in zip(*np.nonzero(cells != WALL)):
+        if labels[start] >= 0:
+            continue
+        labels[start] = n
+        queue = deque([start])
+        while queue:
+            r, c = queue.popleft()
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < cells.shape[0] and 0 <= nc < cells.shape[1] \
+                        and cells[nr, nc] != WALL and labels[nr, nc] < 0:
+                    labels[nr, nc] = n
+                    queue.append((nr, nc))
+        n += 1
+    return labels
+
+
+def test_label_components_matches_bfs():
+    rng = np.random.default_rng(0)
+    for wall_ratio in (0.0, 0.3, 0.5, 0.7, 1.0):
+        cells = np.where(rng.random((17, 23)) < wall_ratio, WALL, 0).astype(np.uint8)
+        labels = label_components(cells)
+        ref = _bfs_labels(cells)
+        assert labels.dtype == np.int32
+        assert np.array_equal(labels < 0, ref < 0)
+        # Gleiche Partition (Labelnummern dürfen abweichen), Labels 0..k-1
+        free = ref >= 0
+        pairs = np.unique(np.stack([labels[free], ref[free]]), axis=1)
+        assert pairs.shape[1] == len(np.unique(ref[free])) == len(np.unique(labels[free]))
+        if free.any():
+            assert labels.max() + 1 == pairs.shape[1]
+
+
+def test_connected_uses_labels():
+    cells = np.zeros((3, 5), dtype=np.uint8)
+    cells[:, 2] = WALL
+    raster = GridRaster(cells)
+    assert raster.connected((0, 0), (2, 1))
+    assert not raster.connected((0, 0), (0, 4))
+    assert not raster.connected((0, 0), (0, 2))
@@ -0,0 +1,61 @@
+# tests/test_replan.py
+import numpy as np
+import pytest
+
+from gridworld.env import GridWorldEnv
+from gridworld.raster import WALL, random_raster
+from planning.replan import grow_q, local_sweep
+from planning.solvers import value_iteration
+
+
+def _replan(changes, seed=0, size=20):
+    raster = random_raster(size, size, seed=seed)
+    env = GridWorldEnv(raster, start=(0, 0), goal=(size - 1, size - 1))
+    Q = value_iteration(env.T, env.R, env.mask, env.goal_state)
+    affected = env.update_cells(changes)
+    Q = grow_q(Q, env.n_states)
+    local_sweep(Q, env.T, env.R, env.mask, env.goal_state, affected, theta=1e-10)
+    Q_ref = value_iteration(env.T, env.R, env.mask, env.goal_state)
+    return env, raster, Q, Q_ref
+
+
+def test_local_sweep_matches_value_iteration_after_closing_cells():
+    changes = {(17, 12): 2, (5, 6): 0, (1, 0): 0, (16, 12): WALL, (10, 12): WALL}
+    env, _raster, Q, Q_ref = _replan(changes)
+    np.testing.assert_allclose(np.where(env.mask, Q, 0.0), np.where(env.mask, Q_ref, 0.0), atol=1e-6)
+
+
+def test_local_sweep_matches_value_iteration_after_opening_cells():
+    raster = random_raster(20, 20, seed=0)
+    walls = np.argwhere(raster.cells == WALL)[:5]
+    env, _raster, Q, Q_ref = _replan({(int(r), int(c)): 0 for r, c in walls})
+    np.testing.assert_allclose(np.where(env.mask, Q, 0.0), np.where(env.mask, Q_ref, 0.0), atol=1e-6)
+
+
+def test_update_cells_does_not_touch_shared_raster():
+    env, raster, _Q, _Q_ref = _replan({(16, 12): WALL})
+    assert raster.cells[16, 12] != WALL
+    assert env.raster.cells[16, 12] == WALL
+    assert (16, 12) not in env.coord_to_state
+    assert all(env.raster.cells[c] != WALL for c in env.coord_to_state)
+
+
+def test_local_sweep_falls_back_on_learned_q():
+    raster = random_raster(20, 20, seed=1)
+    env = GridWorldEnv(raster, start=(0, 0), goal=(19, 19))
+    rng = np.random.default_rng(0)
+    Q = rng.normal(size=env.T.shape)
+    affected = env.update_cells({(5, 6): 2})
+    n_backups = local_sweep(Q, env.T, env.R, env.mask, env.goal_state, affected, max_backups=50)
+    assert n_backups == 50
+    Q_ref = value_iteration(env.T, env.R, env.mask, env.goal_state)
+    np.testing.assert_allclose(Q, Q_ref)
+
+
+def test_update_cells_validates_changes():
+    env = GridWorldEnv(random_raster(10, 10, seed=0), start=(0, 0), goal=(9, 9))
+    with pytest.raises(ValueError):
+        env.update_cells({(3, 3): 7})
+    with pytest.raises(ValueError):
+        env.update_cells({(0, 1): WALL, (1, 0): WALL})
+    assert env.raster.cells[0, 1] != WALL
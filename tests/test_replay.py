@@ -0,0 +1,48 @@
+# tests/test_replay.py
+import numpy as np
+
+from q_learning.agent import QLearningAgent
+from q_learning.replay import ReplayBuffer
+
+
+def _filled(capacity, n, prioritized=True, seed=0):
+    buf = ReplayBuffer(capacity, 4, prioritized=prioritized, seed=seed)
+    rng = np.random.default_rng(seed)
+    buf.add_batch(np.arange(n), np.zeros(n), np.ones(n), np.arange(n), np.ones((n, 4), dtype=bool), np.zeros(n, dtype=bool))
+    buf.update_priorities(np.arange(min(n, capacity)), rng.exponential(size=min(n, capacity)))
+    return buf
+
+
+def test_sum_tree_matches_priorities():
+    buf = _filled(100, 130)
+    buf.add(7, 1, 0.5, 8, np.ones(4, dtype=bool))
+    p = buf.priority[:len(buf)] ** buf.priority_exponent
+    assert np.isclose(buf._sum_tree[1], p.sum())
+    assert np.isclose(buf._min_tree[1], p.min())
+
+
+def test_prioritized_sampling_is_proportional():
+    buf = _filled(50, 50)
+    idx = buf.sample(200_000)[0]
+    freq = np.bincount(idx, minlength=50) / len(idx)
+    p = buf.priority[:50] ** buf.priority_exponent
+    np.testing.assert_allclose(freq, p / p.sum(), atol=3e-3)
+
+
+def test_importance_weights():
+    buf = _filled(64, 64)
+    idx, *_, weights = buf.sample(1000)
+    p = buf.priority[:64] ** buf.priority_exponent
+    expected = (p[idx] / p.min()) ** -buf.importance_exponent
+    np.testing.assert_allclose(weights, expected)
+    assert weights.max() <= 1.0
+
+    uniform = _filled(64, 64, prioritized=False)
+    assert np.all(uniform.sample(10)[-1] == 1.0)
+
+
+def test_replay_scales_steps_by_weights():
+    agent = QLearningAgent(4, 2, alpha=0.5)
+    agent.update_batch(np.array([0, 1]), np.array([0, 0]), np.array([1.0, 1.0]), np.array([2, 2]),
+                       np.ones((2, 2), dtype=bool), np.array([True, True]), weights=np.array([1.0, 0.5]))
+    np.testing.assert_allclose(agent.Q[[0, 1], 0], [0.5, 0.25])
@@ -0,0 +1,26 @@
+# tests/test_shortest_path.py
+import numpy as np
+
+from gridworld.env import GridWorldEnv
+from gridworld.raster import GridRaster, WALL, random_raster
+from planning.shortest_path import cost_to_go, path_cost, shortest_path
+
+
+def _opened_env():
+    raster = random_raster(20, 20, wall_ratio=0.25, bottleneck_ratio=0.1, seed=4)
+    env = GridWorldEnv(grid=raster, start=(0, 0), goal=(19, 19))
+    walls = np.argwhere(env.raster.cells == WALL)[:15]
+    env.update_cells({(int(r), int(c)): 0 for r, c in walls})
+    return env
+
+
+def test_planners_after_opening_cells():
+    env = _opened_env()
+    fresh = GridRaster(env.raster.cells.copy())
+    for use_heuristic in (True, False):
+        path, cost = shortest_path(env.grid, (0, 0), (19, 19), use_heuristic=use_heuristic)
+        _path, fresh_cost = shortest_path(fresh, (0, 0), (19, 19), use_heuristic=use_heuristic)
+        assert path[0] == (0, 0) and path[-1] == (19, 19)
+        assert cost == fresh_cost
+        assert path_cost(env.grid, path) == cost
+    np.testing.assert_array_equal(cost_to_go(env.grid, (19, 19)), cost_to_go(fresh, (19, 19)))
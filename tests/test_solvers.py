@@ -0,0 +1,65 @@
+# tests/test_solvers.py
+import warnings
+
+import numpy as np
+import pytest
+
+from gridworld.env import GridWorldEnv
+from gridworld.maps import random_map
+from planning.solvers import evaluate_policy, greedy_policy, policy_iteration, value_iteration
+
+
+def _env():
+    grid = random_map(rows=12, cols=12, wall_ratio=0.18, bottleneck_ratio=0.12, seed=3)
+    return GridWorldEnv(grid=grid, start=(0, 0), goal=(11, 11))
+
+
+def test_evaluate_policy_terminates_without_discount():
+    env = _env()
+    Q = value_iteration(env.T, env.R, env.mask, env.goal_state, gamma=0.99)
+    policy = greedy_policy(Q, env.mask)
+    V = evaluate_policy(policy, env.T, env.R, env.goal_state, gamma=1.0)
+
+    # Referenz: Policy Schritt für Schritt bis zum Ziel abfahren
+    s, ret = env.coord_to_state[env.start], 0.0
+    for _ in range(env.n_states):
+        if s == env.goal_state:
+            break
+        a = policy[s]
+        ret += env.R[s, a]
+        s = env.T[s, a]
+    assert s == env.goal_state
+    assert V[env.coord_to_state[env.start]] == pytest.approx(ret)
+
+
+def test_policy_iteration_gamma_one_terminates():
+    env = _env()
+    Q = policy_iteration(env.T, env.R, env.mask, env.goal_state, gamma=1.0, max_iter=50)
+    assert np.isfinite(Q).all()
+
+
+def test_evaluate_policy_rejects_gamma_above_one():
+    env = _env()
+    policy = greedy_policy(np.zeros(env.T.shape), env.mask)
+    with pytest.raises(ValueError):
+        evaluate_policy(policy, env.T, env.R, env.goal_state, gamma=1.5)
+
+
+def test_value_iteration_gamma_one_with_unreachable_pocket():
+    grid = random_map(rows=6, cols=6, wall_ratio=0.0, bottleneck_ratio=0.0, seed=0)
+    # Zelle (0, 5) abgeschnitten: ohne Diskontierung hat sie keinen endlichen Wert
+    grid.walls.update({(0, 4), (1, 5)})
+    env = GridWorldEnv(grid=grid, start=(5, 0), goal=(5, 5))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Q = value_iteration(env.T, env.R, env.mask, env.goal_state, gamma=1.0)
+    assert np.isfinite(Q).all()
+    assert np.all(Q[env.coord_to_state[(0, 5)]] <= 0.0)
+    V = np.where(env.mask, Q, -np.inf).max(axis=1)
+    assert V[env.coord_to_state[(5, 0)]] == pytest.approx(5 * -1.0 + env.goal_reward)
+
+
+def test_value_iteration_warns_without_convergence():
+    env = _env()
+    with pytest.warns(RuntimeWarning):
+        value_iteration(env.T, env.R, env.mask, env.goal_state, gamma=0.99, max_iter=5)
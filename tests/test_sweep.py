@@ -0,0 +1,25 @@
+# tests/test_sweep.py
+import json
+
+from sweep import load_results, run_id, run_seed, run_sweep
+
+
+def test_resume_repairs_partial_line_and_records_failures(tmp_path):
+    path = tmp_path / "results.jsonl"
+    good = {"num_episodes": 20, "max_steps": 30, "alpha": 0.5}
+    bad = {"num_episodes": 20, "max_steps": 30, "goal": [9, 9]}   # Ziel ausserhalb der 6x6-Karte
+    records = run_sweep([good], str(path), max_workers=1, window=5)
+    assert [rec["run_id"] for rec in records] == [run_id(good, run_seed(0, good))]
+
+    # Abgebrochener Schreibvorgang: unvollständige letzte Zeile ohne Zeilenumbruch
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"run_id": "abc", "summ')
+    records = run_sweep([good, bad], str(path), max_workers=1, window=5)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2 and all(json.loads(line) for line in lines)
+    failed = [rec for rec in records if "error" in rec]
+    assert len(records) == 2 and failed and failed[0]["params"] == bad
+
+    # Fehlgeschlagene Runs werden beim Fortsetzen wiederholt, erfolgreiche übersprungen
+    run_sweep([good, bad], str(path), max_workers=1, window=5)
+    assert [("error" in rec) for rec in load_results(str(path))] == [False, True, True]
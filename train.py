@@ -3,40 +3,24 @@ import matplotlib.pyplot as plt
 from warehouse.reward_matrix import build_reward_matrix
 from warehouse.env import WarehouseEnv
 from q_learning.agent import QLearningAgent
+from q_learning.fast_train import fast_train_agent
 
 import matplotlib
 matplotlib.use("TkAgg")
 
 def train(num_episodes=1000, max_steps=100, alpha=0.9, gamma=0.75,
           eps_start=1.0, eps_min=0.05, eps_decay=0.995, seed=42):
-    np.random.seed(seed)
-
     R = build_reward_matrix()
     env = WarehouseEnv(R, start_state=0, goal_state=11, max_steps=max_steps)
     agent = QLearningAgent(env.observation_space_n, env.action_space_n,
                            alpha=alpha, gamma=gamma,
                            epsilon_start=eps_start, epsilon_min=eps_min, epsilon_decay=eps_decay)
 
-    episode_rewards = []
-    steps_to_goal = []
-
-    for ep in range(num_episodes):
-        s = env.reset()
-        total_r = 0.0
-        for t in range(max_steps):
-            valid_actions = env.valid_actions(s)
-            a = agent.choose_action(s, valid_actions)
-            s_next, r, done, _ = env.step(a)
-            total_r += r
-            agent.update(s, a, r, s_next, env.valid_actions(s_next))
-            s = s_next
-            if done:
-                steps_to_goal.append(t + 1)
-                break
-
-        agent.decay_epsilon()
-        episode_rewards.append(total_r)
+    result = fast_train_agent(agent, env.T, env.R_step, env.mask, env.start_state, env.goal_state,
+                              n_episodes=num_episodes, max_steps=max_steps, seed=seed)
 
+    episode_rewards = result.returns.tolist()
+    steps_to_goal = result.steps.tolist()
     return agent, episode_rewards, steps_to_goal, R
 
 if __name__ == "__main__":
@@ -1,8 +1,13 @@
 # train_grid.py
-import numpy as np
 from gridworld.maps import default_map_6x6
 from gridworld.env import GridWorldEnv
 from q_learning.agent import QLearningAgent
+from q_learning.fast_train import fast_train_agent
+from q_learning.q_lambda import QLambdaAgent
+from q_learning.loop import train_agent
+from q_learning.replay import ReplayBuffer
+from q_learning.parallel import parallel_train
+from q_learning.metrics import MetricsRecorder
 
 def train_grid(
     num_episodes=2000,
@@ -18,10 +23,15 @@ def train_grid(
     step_cost=-1.0,
     goal_reward=100.0,
     invalid_move_penalty=-10.0,
-    bottleneck_penalty=-10.0
+    bottleneck_penalty=-10.0,
+    trace_lambda=None,
+    replay_capacity=None,
+    replay_batch_size=32,
+    n_workers=None,
+    sync_interval=64,
+    metrics_sink=None,
+    metrics_every=1
 ):
-    np.random.seed(seed)
-
     grid = default_map_6x6()
     env = GridWorldEnv(
         grid=grid,
@@ -31,10 +41,10 @@ def train_grid(
         step_cost=step_cost,
         goal_reward=goal_reward,
         invalid_move_penalty=invalid_move_penalty,
-        bottleneck_penalty=bottleneck_penalty
+        bottleneck_base_penalty=bottleneck_penalty
     )
 
-    agent = QLearningAgent(
+    agent_params = dict(
         n_states=env.observation_space_n,
         n_actions=env.action_space_n,
         alpha=alpha,
@@ -44,48 +54,44 @@ def train_grid(
         epsilon_decay=eps_decay
     )
 
-    episode_returns = []
-    steps_to_goal = []
-    bottleneck_hits = []
-    reached_goal_flags = []
-
-    for ep in range(num_episodes):
-        s = env.reset()
-        total_r = 0.0
-        bn_count = 0
-        reached_goal = False
-
-        for t in range(max_steps):
-            valid = env.valid_actions(s)
-            a = agent.choose_action(s, valid)
-
-            s_next, r, done, info = env.step(a)
-            total_r += r
-
-            # Bottleneck hit tracking
-            if info.get("coord") in env.grid.bottlenecks:
-                bn_count += 1
-
-            agent.update(s, a, r, s_next, env.valid_actions(s_next))
-            s = s_next
-
-            if info.get("coord") == env.goal:
-                reached_goal = True
+    # Optional: Episodenmetriken (jede metrics_every-te) nach CSV/JSONL/Parquet streamen
+    recorder = MetricsRecorder(metrics_sink, sample_every=metrics_every) if metrics_sink is not None else None
 
-            if done:
-                steps_to_goal.append(t + 1)
-                break
+    if sum(x is not None for x in (trace_lambda, replay_capacity, n_workers)) > 1:
+        raise ValueError("trace_lambda, replay_capacity und n_workers lassen sich nicht kombinieren.")
 
-        agent.decay_epsilon()
-        episode_returns.append(total_r)
-        bottleneck_hits.append(bn_count)
-        reached_goal_flags.append(1 if reached_goal else 0)
+    if n_workers is not None:
+        # Actor/Learner: Rollouts in n_workers Prozessen, Updates zentral auf geteiltem Q
+        agent = QLearningAgent(**agent_params)
+        result = parallel_train(env, agent, n_episodes=num_episodes, max_steps=max_steps,
+                                n_workers=n_workers, sync_interval=sync_interval, seed=seed,
+                                metrics=recorder)
+    elif replay_capacity is not None:
+        # Replay-Modus: jede Transition landet im Buffer und wird in Mini-Batches wiederverwendet
+        buffer = ReplayBuffer(replay_capacity, env.action_space_n, seed=seed)
+        agent = QLearningAgent(**agent_params, replay_buffer=buffer, replay_batch_size=replay_batch_size)
+        result = train_agent(env, agent, num_episodes=num_episodes, max_steps=max_steps, seed=seed,
+                             metrics=recorder)
+    elif trace_lambda is None:
+        agent = QLearningAgent(**agent_params)
+        result = fast_train_agent(agent, env.T, env.R, env.mask, env.coord_to_state[start], env.goal_state,
+                                  n_episodes=num_episodes, max_steps=max_steps, seed=seed, levels=env.L,
+                                  metrics=recorder)
+    else:
+        # Q(lambda): Credit wandert pro Episode den ganzen Pfad zurück (weniger Episoden auf langen Routen)
+        agent = QLambdaAgent(**agent_params, lam=trace_lambda)
+        result = train_agent(env, agent, num_episodes=num_episodes, max_steps=max_steps, seed=seed,
+                             metrics=recorder)
 
     metrics = {
-        "episode_returns": episode_returns,
-        "steps_to_goal": steps_to_goal,
-        "bottleneck_hits": bottleneck_hits,
-        "reached_goal_flags": reached_goal_flags,
+        "episode_returns": result.returns.tolist(),
+        "steps_to_goal": result.steps.tolist(),
+        "bottleneck_hits": result.bottleneck_hits.tolist(),
+        "bottleneck_level_sum": result.bottleneck_level_sum.tolist(),
+        "reached_goal_flags": result.reached_goal.astype(int).tolist(),
+        "epsilons": result.epsilons.tolist(),
+        "mean_abs_td": result.mean_abs_td.tolist(),
+        "wall_time": result.wall_time.tolist(),
         "final_epsilon": agent.epsilon,
         "params": {
             "alpha": alpha,
@@ -99,6 +105,12 @@ def train_grid(
             "bottleneck_penalty": bottleneck_penalty,
             "num_episodes": num_episodes,
             "max_steps": max_steps,
+            "trace_lambda": trace_lambda,
+            "replay_capacity": replay_capacity,
+            "replay_batch_size": replay_batch_size,
+            "n_workers": n_workers,
+            "sync_interval": sync_interval,
+            "metrics_every": metrics_every,
         }
     }
 
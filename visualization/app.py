@@ -1,4 +1,6 @@
 # visualization/app.py
+import threading
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, TextBox, RadioButtons
@@ -7,7 +9,10 @@ from matplotlib.lines import Line2D
 
 from gridworld.maps import random_map
 from gridworld.env import GridWorldEnv
-from q_learning.agent import QLearningAgent
+from q_learning.agent import QLearningAgent, policy_and_value
+from q_learning.fast_train import fast_train_agent
+from visualization.cache import PolicyCache, config_key
+from visualization.render import BlitManager, GridPanel, ValuePolicyPanel
 
 # ---------- Helper: Parsing ----------
 def parse_coord(text: str):
@@ -18,87 +23,36 @@ def parse_coord(text: str):
     c = int(parts[1].strip())
     return (r, c)
 
-# ---------- Drawing: Grid / Policy / Values ----------
-ACTION_TO_DELTA = {0: (-1, 0), 1: (0, 1), 2: (1, 0), 3: (0, -1)}
+# ---------- Drawing (grid + policy panels: visualization.render) ----------
+class _StaticBlit:
+    """Stand-in for BlitManager for one-off drawings: artists stay regular (not animated)."""
 
-def draw_grid(ax, env: GridWorldEnv, start=None, goal=None, path=None, title=None):
-    g = env.grid
-    ax.clear()
-    ax.set_xlim(-0.5, g.cols - 0.5)
-    ax.set_ylim(g.rows - 0.5, -0.5)
-    ax.set_xticks(range(g.cols))
-    ax.set_yticks(range(g.rows))
-    ax.grid(True)
-    ax.set_aspect("equal", adjustable="box")
-
-    # walls
-    for (r, c) in g.walls:
-        ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, fill=True))
-
-    # bottlenecks with level text
-    for (r, c), level in g.bottlenecks.items():
-        ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, fill=False, hatch="///"))
-        ax.text(c, r, str(level), ha="center", va="center", fontsize=9)
-
-    if start is not None:
-        ax.scatter([start[1]], [start[0]], marker="s", s=200)
-    if goal is not None:
-        ax.scatter([goal[1]], [goal[0]], marker="X", s=220)
-
-    if path:
-        xs = [c for (r, c) in path]
-        ys = [r for (r, c) in path]
-        ax.plot(xs, ys, linewidth=3)
+    def add(self, ax, artist):
+        return artist
+
+    def clear(self, ax):
+        pass
+
+    def update(self, ax):
+        ax.figure.canvas.draw_idle()
 
+def draw_grid(ax, env: GridWorldEnv, start=None, goal=None, path=None, title=None):
+    panel = GridPanel(ax, _StaticBlit())
+    panel.set_map(env)
+    panel.update(start=start, goal=goal, path=path)
     if title:
         ax.set_title(title)
 
+def draw_value_and_policy(ax, env: GridWorldEnv, agent: QLearningAgent, start=None, goal=None):
+    # Jeder Agent mit Q-Tabelle [n_states, n_actions], auch Planner-Ergebnisse (as_agent)
+    panel = ValuePolicyPanel(ax, _StaticBlit())
+    panel.set_map(env)
+    panel.update(agent.Q, start=start, goal=goal)
+
 def compute_value_grid(env: GridWorldEnv, agent: QLearningAgent):
-    g = env.grid
-    V = np.full((g.rows, g.cols), np.nan, dtype=float)
-    for coord, sid in env.coord_to_state.items():
-        r, c = coord
-        valid = env.valid_actions(sid)
-        if len(valid) == 0:
-            V[r, c] = np.nan
-        else:
-            V[r, c] = np.max(agent.Q[sid, valid])
+    V, _actions = agent.policy_and_value_grids(env)
     return V
 
-def draw_value_and_policy(ax, env: GridWorldEnv, agent: QLearningAgent, start=None, goal=None):
-    g = env.grid
-    ax.clear()
-    V = compute_value_grid(env, agent)
-
-    ax.imshow(V, origin="upper")
-    ax.set_xticks(range(g.cols))
-    ax.set_yticks(range(g.rows))
-    ax.set_title("Value Heatmap + Policy Arrows")
-
-    # walls overlay
-    for (r, c) in g.walls:
-        ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, fill=True))
-
-    # bottlenecks overlay with level
-    for (r, c), level in g.bottlenecks.items():
-        ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, fill=False, hatch="///"))
-        ax.text(c, r, str(level), ha="center", va="center", fontsize=8)
-
-    # policy arrows
-    for coord, sid in env.coord_to_state.items():
-        r, c = coord
-        valid = env.valid_actions(sid)
-        if len(valid) == 0:
-            continue
-        a = agent.predict_action(sid, valid)
-        dr, dc = ACTION_TO_DELTA[a]
-        ax.arrow(c, r, 0.3 * dc, 0.3 * dr, head_width=0.15, length_includes_head=True)
-
-    if start is not None:
-        ax.scatter([start[1]], [start[0]], marker="s", s=120)
-    if goal is not None:
-        ax.scatter([goal[1]], [goal[0]], marker="X", s=140)
-
 def draw_returns(ax, returns):
     ax.clear()
     ax.set_title("Training Returns (Cost-aware)")
@@ -113,8 +67,7 @@ def draw_returns(ax, returns):
     ax.legend()
 
 # ---------- Training / Rollout ----------
-def train_env(env: GridWorldEnv, num_episodes=2500, max_steps=250, seed=42):
-    np.random.seed(seed)
+def train_env(env: GridWorldEnv, num_episodes=2500, max_steps=250, seed=42, progress=None, metrics=None):
     agent = QLearningAgent(
         n_states=env.observation_space_n,
         n_actions=env.action_space_n,
@@ -125,25 +78,15 @@ def train_env(env: GridWorldEnv, num_episodes=2500, max_steps=250, seed=42):
         epsilon_decay=0.995,
     )
 
-    returns = []
-    steps_to_goal = []
-
-    for _ in range(num_episodes):
-        s = env.reset()
-        total_r = 0.0
-        for t in range(max_steps):
-            valid = env.valid_actions(s)
-            a = agent.choose_action(s, valid)
-            s_next, r, done, _ = env.step(a)
-            total_r += r
-            agent.update(s, a, r, s_next, env.valid_actions(s_next))
-            s = s_next
-            if done:
-                steps_to_goal.append(t + 1)
-                break
-        agent.decay_epsilon()
-        returns.append(total_r)
+    # Eigene Kopie von R: set_start_goal patcht env.R in place, auch während ein Hintergrund-Job läuft
+    result = fast_train_agent(
+        agent, env.T, env.R.copy(), env.mask, env.coord_to_state[env.start], env.goal_state,
+        n_episodes=num_episodes, max_steps=min(max_steps, env.max_steps), seed=seed, levels=env.L,
+        progress=progress, metrics=metrics,
+    )
 
+    returns = result.returns.tolist()
+    steps_to_goal = result.steps.tolist()
     return agent, returns, steps_to_goal
 
 def greedy_rollout(env: GridWorldEnv, agent: QLearningAgent, max_steps=250):
@@ -153,10 +96,14 @@ def greedy_rollout(env: GridWorldEnv, agent: QLearningAgent, max_steps=250):
 
     bottleneck_hits = 0
     bottleneck_level_sum = 0
+    # Greedy-Aktion aller Zustände einmal vorab, danach nur Tabellen-Lookups
+    _values, actions = policy_and_value(agent.Q, env.mask)
 
     for _ in range(max_steps):
-        valid = env.valid_actions(s)
-        a = agent.predict_action(s, valid)
+        a = int(actions[s])
+        if a < 0:
+            # Zustand ohne gültige Aktion: greedy geht es nicht weiter
+            break
         s, r, done, info = env.step(a)
         total_r += r
 
@@ -174,7 +121,7 @@ def greedy_rollout(env: GridWorldEnv, agent: QLearningAgent, max_steps=250):
     return path, total_r, bottleneck_hits, bottleneck_level_sum
 
 # ---------- App ----------
-def main():
+def main(cache_dir=None):
     MAP_ROWS = 12
     MAP_COLS = 12
     WALL_RATIO = 0.18
@@ -189,6 +136,11 @@ def main():
         bottleneck_base_penalty=-6.0,  # Level 1=-6, Level 2=-12, Level 3=-18
     )
 
+    TRAIN_PARAMS = dict(num_episodes=2500, max_steps=250, seed=42)
+
+    # Trained results per (map, start, goal, reward config); optional on-disk persistence
+    policy_cache = PolicyCache(maxsize=32, cache_dir=cache_dir)
+
     seed_counter = {"seed": 42}
 
     def make_env_with_new_map(seed):
@@ -217,13 +169,21 @@ def main():
     ax_returns = fig.add_subplot(gs[0, 1:])
     ax_value = fig.add_subplot(gs[1, 1:])
 
+    # Statische Karten-Layer einmal pro Karte, Marker/Pfad/Policy per Blitting
+    blit = BlitManager(fig.canvas)
+    grid_panel = GridPanel(ax_grid, blit)
+    value_panel = ValuePolicyPanel(ax_value, blit)
+    grid_panel.set_map(env)
+    value_panel.set_map(env)
+
     # Bottom controls
     ax_mode      = fig.add_axes([0.05, 0.03, 0.15, 0.12])
     ax_startbox  = fig.add_axes([0.23, 0.06, 0.12, 0.06])
     ax_goalbox   = fig.add_axes([0.36, 0.06, 0.12, 0.06])
-    ax_trainbtn  = fig.add_axes([0.50, 0.06, 0.12, 0.06])
-    ax_resetbtn  = fig.add_axes([0.64, 0.06, 0.12, 0.06])
-    ax_changemap = fig.add_axes([0.78, 0.06, 0.18, 0.06])
+    ax_trainbtn  = fig.add_axes([0.50, 0.06, 0.10, 0.06])
+    ax_cancelbtn = fig.add_axes([0.61, 0.06, 0.08, 0.06])
+    ax_resetbtn  = fig.add_axes([0.70, 0.06, 0.08, 0.06])
+    ax_changemap = fig.add_axes([0.79, 0.06, 0.17, 0.06])
 
     mode = RadioButtons(ax_mode, ("Set Start (click)", "Set Goal (click)"), active=0)
     for t in mode.labels:
@@ -232,6 +192,7 @@ def main():
     start_box = TextBox(ax_startbox, "Start (r,c): ", initial="0,0")
     goal_box = TextBox(ax_goalbox, "Goal (r,c): ", initial=f"{grid.rows-1},{grid.cols-1}")
     train_btn = Button(ax_trainbtn, "Train + Show")
+    cancel_btn = Button(ax_cancelbtn, "Cancel")
     reset_btn = Button(ax_resetbtn, "Reset View")
     change_btn = Button(ax_changemap, "Change Map")
 
@@ -243,8 +204,13 @@ def main():
         "agent": None,
         "returns": None,
         "path": None,
+        "stats": None,  # Greedy-Rollout-Kennzahlen des angezeigten Ergebnisses
+        "job": None,  # laufender Trainings-Job (Hintergrund-Thread)
     }
 
+    # Timer-getriebenes Live-Redraw, solange ein Job läuft
+    timer = fig.canvas.new_timer(interval=200)
+
     legend_elements = [
         Patch(facecolor="black", label="Wall (blocked)"),
         Patch(facecolor="none", hatch="///", label="Bottleneck (extra cost; level 1-3)"),
@@ -262,13 +228,25 @@ def main():
     )
 
     def refresh_title():
+        stats, path = state["stats"], state["path"]
+        if stats is not None and path:
+            ax_grid.set_title(
+                f"Greedy path | steps={len(path)-1}, return={stats['greedy_return']:.1f}, "
+                f"bottleneck_hits={stats['bottleneck_hits']}, "
+                f"bottleneck_level_sum={stats['bottleneck_level_sum']}"
+            )
+            return
         ax_grid.set_title(
             "Random Gridworld Warehouse (cost-aware)\n"
             "Set Start/Goal (click or text) → Train + Show"
         )
 
+    def update_panels():
+        grid_panel.update(start=state["start"], goal=state["goal"], path=state["path"])
+        Q = state["agent"].Q if state["agent"] is not None else None
+        value_panel.update(Q, start=state["start"], goal=state["goal"])
+
     def redraw():
-        draw_grid(ax_grid, state["env"], start=state["start"], goal=state["goal"], path=state["path"])
         refresh_title()
 
         if state["returns"] is not None:
@@ -277,17 +255,35 @@ def main():
             ax_returns.clear()
             ax_returns.set_title("Training Returns (Cost-aware)")
 
-        if state["agent"] is not None:
-            draw_value_and_policy(ax_value, state["env"], state["agent"], start=state["start"], goal=state["goal"])
-        else:
-            ax_value.clear()
-            ax_value.set_title("Value Heatmap + Policy Arrows")
-
+        update_panels()
         fig.canvas.draw_idle()
 
     def sync_env_start_goal():
         state["env"].set_start_goal(state["start"], state["goal"])
 
+    def current_key():
+        return config_key(state["grid"], state["start"], state["goal"], REWARD_CONFIG, TRAIN_PARAMS)
+
+    def on_selection_changed():
+        # Neuer Start/Ziel macht einen laufenden Job hinfällig
+        cancel_job()
+        sync_env_start_goal()
+        # Bereits trainierte Konfiguration sofort anzeigen
+        entry = policy_cache.get(current_key())
+        if entry is not None:
+            show_entry(entry)
+            return
+        had_results = state["returns"] is not None
+        state["agent"] = None
+        state["returns"] = None
+        state["path"] = None
+        state["stats"] = None
+        if had_results:
+            redraw()
+        else:
+            # Nur Marker bewegt: Blitting statt vollem Redraw
+            update_panels()
+
     # Click to set start/goal
     def on_click(event):
         if event.inaxes != ax_grid or event.xdata is None or event.ydata is None:
@@ -302,6 +298,9 @@ def main():
             return
 
         selected_mode = mode.value_selected
+        other = state["goal"] if "Start" in selected_mode else state["start"]
+        if not state["env"].raster.connected((r, c), other):
+            return
         if "Start" in selected_mode:
             state["start"] = (r, c)
             start_box.set_val(f"{r},{c}")
@@ -309,11 +308,7 @@ def main():
             state["goal"] = (r, c)
             goal_box.set_val(f"{r},{c}")
 
-        sync_env_start_goal()
-        state["agent"] = None
-        state["returns"] = None
-        state["path"] = None
-        redraw()
+        on_selection_changed()
 
     fig.canvas.mpl_connect("button_press_event", on_click)
 
@@ -321,28 +316,20 @@ def main():
     def on_start_submit(text):
         try:
             coord = parse_coord(text)
-            if coord in state["grid"].walls:
+            if not state["env"].raster.connected(coord, state["goal"]):
                 return
             state["start"] = coord
-            sync_env_start_goal()
-            state["agent"] = None
-            state["returns"] = None
-            state["path"] = None
-            redraw()
+            on_selection_changed()
         except Exception:
             pass
 
     def on_goal_submit(text):
         try:
             coord = parse_coord(text)
-            if coord in state["grid"].walls:
+            if not state["env"].raster.connected(state["start"], coord):
                 return
             state["goal"] = coord
-            sync_env_start_goal()
-            state["agent"] = None
-            state["returns"] = None
-            state["path"] = None
-            redraw()
+            on_selection_changed()
         except Exception:
             pass
 
@@ -350,41 +337,123 @@ def main():
     goal_box.on_submit(on_goal_submit)
 
     # Buttons
-    def on_train(_):
-        sync_env_start_goal()
-
-        agent, returns, _steps = train_env(state["env"], num_episodes=2500, max_steps=250, seed=42)
-        path, greedy_return, bottleneck_hits, bottleneck_level_sum = greedy_rollout(state["env"], agent, max_steps=250)
-
+    def show_entry(entry):
+        agent, returns, path = entry["agent"], entry["returns"], entry["path"]
         state["agent"] = agent
         state["returns"] = returns
         state["path"] = path
+        state["stats"] = entry["stats"]
+        redraw()
 
-        draw_grid(
-            ax_grid,
-            state["env"],
-            start=state["start"],
-            goal=state["goal"],
-            path=state["path"],
-            title=f"Greedy path | steps={len(path)-1}, return={greedy_return:.1f}, bottleneck_hits={bottleneck_hits}, bottleneck_level_sum={bottleneck_level_sum}"
+    def cancel_job():
+        job = state["job"]
+        if job is not None:
+            job["cancel"].set()
+            state["job"] = None
+            timer.stop()
+
+    def start_job(key):
+        env = state["env"]
+        job = dict(key=key, cancel=threading.Event(), snapshot=None, result=None, error=None, drawn=0)
+
+        def progress(n_done, Q, returns):
+            job["snapshot"] = (n_done, Q.copy(), returns.copy())
+            return not job["cancel"].is_set()
+
+        def run():
+            try:
+                job["result"] = train_env(env, progress=progress, **TRAIN_PARAMS)
+            except Exception as exc:
+                job["error"] = exc
+
+        job["thread"] = threading.Thread(target=run, daemon=True)
+        state["job"] = job
+        job["thread"].start()
+        timer.start()
+
+    def finish_job(job):
+        agent, returns, _steps = job["result"]
+        path, greedy_return, bottleneck_hits, bottleneck_level_sum = greedy_rollout(
+            state["env"], agent, max_steps=TRAIN_PARAMS["max_steps"]
         )
-        refresh_title()
-        draw_returns(ax_returns, returns)
-        draw_value_and_policy(ax_value, state["env"], agent, start=state["start"], goal=state["goal"])
-        fig.canvas.draw_idle()
+        stats = dict(
+            greedy_return=greedy_return,
+            bottleneck_hits=bottleneck_hits,
+            bottleneck_level_sum=bottleneck_level_sum,
+        )
+        show_entry(policy_cache.put(job["key"], agent, returns, path, stats))
+
+    def poll_job():
+        job = state["job"]
+        if job is None:
+            timer.stop()
+            return
+
+        snapshot = job["snapshot"]
+        if snapshot is not None and snapshot[0] != job["drawn"]:
+            n_done, Q, returns = snapshot
+            job["drawn"] = n_done
+            draw_returns(ax_returns, returns)
+            ax_returns.set_title(f"Training Returns (Cost-aware) | episode {n_done}/{TRAIN_PARAMS['num_episodes']}")
+            value_panel.update(Q, start=state["start"], goal=state["goal"])
+            fig.canvas.draw_idle()
+
+        if job["thread"].is_alive():
+            return
+        state["job"] = None
+        timer.stop()
+        if job["error"] is not None:
+            ax_returns.set_title(f"Training failed: {job['error']}")
+            fig.canvas.draw_idle()
+        elif not job["cancel"].is_set():
+            finish_job(job)
+
+    timer.add_callback(poll_job)
+
+    def on_train(_):
+        sync_env_start_goal()
+
+        key = current_key()
+        job = state["job"]
+        if job is not None and job["key"] == key:
+            return
+        cancel_job()
+
+        entry = policy_cache.get(key)
+        if entry is not None:
+            show_entry(entry)
+            return
+        state["agent"] = None
+        state["returns"] = None
+        state["path"] = None
+        state["stats"] = None
+        redraw()
+        start_job(key)
+
+    def on_cancel(_):
+        job = state["job"]
+        cancel_job()
+        if job is not None:
+            ax_returns.set_title(f"Training cancelled after {job['drawn']} episodes")
+            fig.canvas.draw_idle()
 
     def on_reset(_):
+        cancel_job()
         state["agent"] = None
         state["returns"] = None
         state["path"] = None
+        state["stats"] = None
         redraw()
 
     def on_change_map(_):
+        cancel_job()
         seed_counter["seed"] += 1
         new_grid, new_env = make_env_with_new_map(seed_counter["seed"])
 
         state["grid"] = new_grid
         state["env"] = new_env
+        grid_panel.set_map(new_env)
+        value_panel.set_map(new_env)
 
         state["start"] = (0, 0)
         state["goal"] = (new_grid.rows - 1, new_grid.cols - 1)
@@ -394,9 +463,11 @@ def main():
         state["agent"] = None
         state["returns"] = None
         state["path"] = None
+        state["stats"] = None
         redraw()
 
     train_btn.on_clicked(on_train)
+    cancel_btn.on_clicked(on_cancel)
     reset_btn.on_clicked(on_reset)
     change_btn.on_clicked(on_change_map)
 
@@ -0,0 +1,80 @@
+# visualization/cache.py
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from gridworld.raster import as_raster
+from q_learning.agent import QLearningAgent
+
+
+def config_key(grid, start, goal, reward_config, train_params):
+    """Content hash over map raster, start/goal, reward config and training parameters."""
+    raster = as_raster(grid)
+    h = hashlib.sha1()
+    h.update(np.asarray(raster.cells.shape, dtype=np.int64).tobytes())
+    h.update(raster.cells.tobytes())
+    meta = dict(start=list(start), goal=list(goal), reward=reward_config, train=train_params)
+    h.update(json.dumps(meta, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class PolicyCache:
+    """
+    LRU cache of trained results (agent, returns, greedy path + rollout stats) per config key.
+    With cache_dir, entries are also written to disk and survive app restarts.
+    """
+
+    def __init__(self, maxsize=32, cache_dir=None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.cache_dir is None or not os.path.exists(self._disk_path(key) + ".result.json"):
+            return None
+
+        with open(self._disk_path(key) + ".result.json", "r", encoding="utf-8") as f:
+            result = json.load(f)
+        entry = dict(
+            agent=QLearningAgent.load(self._disk_path(key)),
+            returns=result["returns"],
+            path=[tuple(p) for p in result["path"]],
+            stats=result["stats"],
+        )
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, agent, returns, path, stats):
+        entry = dict(agent=agent, returns=list(returns), path=list(path), stats=dict(stats))
+        self._remember(key, entry)
+        if self.cache_dir is not None:
+            # Erst unter temporärem Namen schreiben, dann umbenennen; result.json zuletzt,
+            # denn get() liest nur Einträge, deren result.json existiert
+            tmp = f"{self._disk_path(key)}.tmp{os.getpid()}"
+            agent.save(tmp)
+            with open(tmp + ".result.json", "w", encoding="utf-8") as f:
+                json.dump(dict(returns=entry["returns"], path=entry["path"], stats=entry["stats"]), f)
+            for ext in (".npy", ".json", ".result.json"):
+                os.replace(tmp + ext, self._disk_path(key) + ext)
+        return entry
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
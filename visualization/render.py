@@ -0,0 +1,198 @@
+# visualization/render.py
+import numpy as np
+from matplotlib.colors import ListedColormap
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+from gridworld.raster import WALL
+from q_learning.agent import policy_and_value
+
+# Aktion -> (dr, dc) als Arrays für die Pfeile (0=UP, 1=RIGHT, 2=DOWN, 3=LEFT)
+ACTION_DR = np.array([-1, 0, 1, 0])
+ACTION_DC = np.array([0, 1, 0, -1])
+
+# Level-Beschriftung nur auf kleinen Karten (sonst zehntausende Text-Artists)
+MAX_LEVEL_LABELS = 400
+# Ticks pro Zelle nur bis zu dieser Kartenbreite
+MAX_CELL_TICKS = 30
+
+
+class BlitManager:
+    """
+    Redraws the animated artists of each registered axes on top of a cached background.
+    The background is captured on every full draw (draw_event); update(ax) then only
+    restores it and redraws that axes' animated artists (matplotlib blitting).
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._artists = {}
+        self._backgrounds = {}
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def add(self, ax, artist):
+        artist.set_animated(True)
+        self._artists.setdefault(ax, []).append(artist)
+        return artist
+
+    def clear(self, ax):
+        self._artists.pop(ax, None)
+        self._backgrounds.pop(ax, None)
+
+    def _on_draw(self, event):
+        for ax in self._artists:
+            self._backgrounds[ax] = self.canvas.copy_from_bbox(ax.bbox)
+            self._draw_animated(ax)
+
+    def _draw_animated(self, ax):
+        for artist in self._artists.get(ax, ()):
+            ax.draw_artist(artist)
+
+    def update(self, ax):
+        background = self._backgrounds.get(ax)
+        if background is None or not self.canvas.supports_blit:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(background)
+        self._draw_animated(ax)
+        self.canvas.blit(ax.bbox)
+        self.canvas.flush_events()
+
+
+def _square_path(rows, cols):
+    """All unit squares around the given cells as one compound Path."""
+    n = len(rows)
+    x0 = np.asarray(cols, dtype=float) - 0.5
+    y0 = np.asarray(rows, dtype=float) - 0.5
+    verts = np.empty((n, 5, 2))
+    verts[:, :, 0] = x0[:, None] + np.array([0, 1, 1, 0, 0])
+    verts[:, :, 1] = y0[:, None] + np.array([0, 0, 1, 1, 0])
+    codes = np.tile([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY], n)
+    return Path(verts.reshape(-1, 2), codes.astype(Path.code_type))
+
+
+def draw_map_layer(ax, raster, fontsize=9):
+    """
+    Walls as one masked imshow, bottlenecks as one hatched PathPatch (+ level labels on small maps).
+    Returns the created artists.
+    """
+    cells = raster.cells
+    walls = np.ma.masked_where(cells != WALL, np.ones(cells.shape))
+    artists = [ax.imshow(walls, cmap=ListedColormap(["black"]), vmin=0, vmax=1,
+                         origin="upper", interpolation="nearest", zorder=2)]
+
+    br, bc = np.nonzero((cells > 0) & (cells != WALL))
+    if len(br):
+        artists.append(ax.add_patch(PathPatch(_square_path(br, bc), fill=False, hatch="///", zorder=3)))
+        if len(br) <= MAX_LEVEL_LABELS:
+            for r, c in zip(br.tolist(), bc.tolist()):
+                artists.append(ax.text(c, r, str(cells[r, c]), ha="center", va="center", fontsize=fontsize, zorder=4))
+    return artists
+
+
+def _setup_axes(ax, raster):
+    ax.set_xlim(-0.5, raster.cols - 0.5)
+    ax.set_ylim(raster.rows - 0.5, -0.5)
+    if raster.cols <= MAX_CELL_TICKS:
+        ax.set_xticks(range(raster.cols))
+    if raster.rows <= MAX_CELL_TICKS:
+        ax.set_yticks(range(raster.rows))
+    ax.set_aspect("equal", adjustable="box")
+
+
+def _set_marker(line, coord):
+    if coord is None:
+        line.set_data([], [])
+    else:
+        line.set_data([coord[1]], [coord[0]])
+
+
+class GridPanel:
+    """
+    Map panel: the static layer (walls, bottlenecks) is built once per map by set_map;
+    start/goal markers and the greedy path are animated artists updated by blitting.
+    """
+
+    def __init__(self, ax, blit: BlitManager):
+        self.ax = ax
+        self.blit = blit
+
+    def set_map(self, env):
+        ax = self.ax
+        self.blit.clear(ax)
+        ax.clear()
+        _setup_axes(ax, env.raster)
+        ax.grid(env.raster.cols <= MAX_CELL_TICKS)
+        draw_map_layer(ax, env.raster, fontsize=9)
+
+        self.path_line = self.blit.add(ax, ax.plot([], [], linewidth=3, color="C2", zorder=5)[0])
+        self.start_marker = self.blit.add(ax, ax.plot([], [], marker="s", markersize=14, linestyle="None",
+                                                      color="C0", zorder=6)[0])
+        self.goal_marker = self.blit.add(ax, ax.plot([], [], marker="X", markersize=15, linestyle="None",
+                                                     color="C1", zorder=6)[0])
+
+    def update(self, start=None, goal=None, path=None):
+        _set_marker(self.start_marker, start)
+        _set_marker(self.goal_marker, goal)
+        if path:
+            path = np.asarray(path)
+            self.path_line.set_data(path[:, 1], path[:, 0])
+        else:
+            self.path_line.set_data([], [])
+        self.blit.update(self.ax)
+
+
+class ValuePolicyPanel:
+    """
+    Value heatmap + greedy policy arrows: one imshow (set_data) and one quiver (set_UVC)
+    under the static map layer; all of them are redrawn by blitting on update.
+    """
+
+    def __init__(self, ax, blit: BlitManager):
+        self.ax = ax
+        self.blit = blit
+
+    def set_map(self, env):
+        ax = self.ax
+        raster = env.raster
+        self.blit.clear(ax)
+        ax.clear()
+        self.env = env
+
+        self.image = self.blit.add(ax, ax.imshow(np.full(raster.cells.shape, np.nan), origin="upper",
+                                                 interpolation="nearest", zorder=1))
+        for artist in draw_map_layer(ax, raster, fontsize=8):
+            self.blit.add(ax, artist)
+
+        self.rows = raster.state_rows.copy()
+        self.cols = raster.state_cols.copy()
+        zeros = np.zeros(len(self.rows))
+        self.quiver = self.blit.add(ax, ax.quiver(self.cols, self.rows, zeros, zeros, angles="xy",
+                                                  scale_units="xy", scale=1, pivot="tail",
+                                                  units="xy", width=0.04, headwidth=3.75, headlength=3.75,
+                                                  headaxislength=3.75, minlength=0, zorder=5))
+        self.start_marker = self.blit.add(ax, ax.plot([], [], marker="s", markersize=11, linestyle="None",
+                                                      color="C0", zorder=6)[0])
+        self.goal_marker = self.blit.add(ax, ax.plot([], [], marker="X", markersize=12, linestyle="None",
+                                                     color="C1", zorder=6)[0])
+        _setup_axes(ax, raster)
+        ax.set_title("Value Heatmap + Policy Arrows")
+
+    def update(self, Q=None, start=None, goal=None):
+        n = len(self.rows)
+        if Q is None:
+            V = np.full(self.env.raster.cells.shape, np.nan)
+            u = v = np.zeros(n)
+        else:
+            values, actions = policy_and_value(Q[:n], self.env.mask[:n])
+            V = self.env.to_grid(values, np.nan)
+            has_valid = actions >= 0
+            u = np.where(has_valid, 0.3 * ACTION_DC[actions], 0.0)
+            v = np.where(has_valid, 0.3 * ACTION_DR[actions], 0.0)
+        self.image.set_data(V)
+        if np.isfinite(V).any():
+            self.image.set_clim(np.nanmin(V), np.nanmax(V))
+        self.quiver.set_UVC(u, v)
+        _set_marker(self.start_marker, start)
+        _set_marker(self.goal_marker, goal)
+        self.blit.update(self.ax)
@@ -16,6 +16,12 @@ class WarehouseEnv:
         self.goal_state = goal_state
         self.max_steps = max_steps
 
+        # Dichte Tabellen analog zu GridWorldEnv: T (Folgezustand), R_step (Reward inkl. Strafe), mask
+        self.mask = reward_matrix > 0
+        nodes = np.arange(self.n_states)
+        self.T = np.where(self.mask, nodes[None, :], nodes[:, None])
+        self.R_step = np.where(self.mask, reward_matrix, -10.0)
+
         self.state = None
         self.steps = 0
 
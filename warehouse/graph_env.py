@@ -0,0 +1,140 @@
+import numpy as np
+
+
+def build_csr(n_nodes, src, dst, weights, directed=False):
+    """
+    Edge lists -> CSR arrays (indptr int64, indices int32, weights float32), edges sorted by
+    (src, dst). Undirected edges are added in both directions.
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float32)
+    if not directed:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        weights = np.concatenate([weights, weights])
+    order = np.lexsort((dst, src))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n_nodes))])
+    return indptr, dst[order].astype(np.int32), weights[order]
+
+
+class GraphWarehouseEnv:
+    """
+    Warehouse graph in CSR form (indptr/indices/rewards per edge) instead of a dense n x n matrix.
+    An action is a global edge id: the valid actions of node s are indptr[s]..indptr[s+1]-1,
+    so valid_actions and step cost O(degree) / O(1) and memory grows with the number of edges.
+    Same API and reward semantics as WarehouseEnv (invalid action: -10, agent stays).
+    goal_state defaults to the last node (node 11 of the 12-node example, like WarehouseEnv).
+    """
+
+    def __init__(self, indptr, indices, rewards, start_state=0, goal_state=None, max_steps=100):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.rewards = np.asarray(rewards, dtype=np.float32)
+        self.n_states = len(self.indptr) - 1
+        self.n_edges = len(self.indices)
+        self.n_actions = self.n_edges
+        self.start_state = start_state
+        self.goal_state = self.n_states - 1 if goal_state is None else goal_state
+        self.max_steps = max_steps
+
+        # Quellknoten je Kante (für vektorisierte Auswertungen)
+        self.edge_src = np.repeat(np.arange(self.n_states, dtype=np.int32), np.diff(self.indptr))
+
+        self.state = None
+        self.steps = 0
+
+    @classmethod
+    def from_edges(cls, n_nodes, src, dst, rewards=None, goal_state=None, goal_reward=1000.0,
+                   directed=False, start_state=0, max_steps=100):
+        """
+        Builds the CSR graph from edge lists. `rewards` per edge defaults to 1.0 (as in
+        build_reward_matrix; pass -cost for cost-weighted graphs); every edge into the goal
+        gets goal_reward (goal_state defaults to the last node). Undirected edges are added
+        in both directions.
+        """
+        goal_state = n_nodes - 1 if goal_state is None else goal_state
+        rewards = np.ones(len(src), dtype=np.float32) if rewards is None else rewards
+        indptr, indices, rewards = build_csr(n_nodes, src, dst, rewards, directed=directed)
+        rewards[indices == goal_state] = goal_reward
+        return cls(indptr, indices, rewards, start_state=start_state, goal_state=goal_state, max_steps=max_steps)
+
+    @classmethod
+    def from_reward_matrix(cls, R, start_state=0, goal_state=None, max_steps=100):
+        """Converts a dense WarehouseEnv reward matrix (or any scipy.sparse matrix) into CSR form."""
+        if hasattr(R, "tocsr"):
+            csr = R.tocsr()
+            csr.eliminate_zeros()
+            keep = csr.data > 0
+            src = np.repeat(np.arange(csr.shape[0]), np.diff(csr.indptr))[keep]
+            dst, values = csr.indices[keep], csr.data[keep]
+        else:
+            src, dst = np.nonzero(R > 0)
+            values = R[src, dst]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=R.shape[0]))])
+        return cls(indptr, dst, values, start_state=start_state, goal_state=goal_state, max_steps=max_steps)
+
+    @property
+    def observation_space_n(self):
+        return self.n_states
+
+    @property
+    def action_space_n(self):
+        return self.n_actions
+
+    def degree(self, s):
+        return int(self.indptr[s + 1] - self.indptr[s])
+
+    def valid_actions(self, s):
+        return np.arange(self.indptr[s], self.indptr[s + 1])
+
+    def reset(self, *, seed=None):
+        if seed is not None:
+            np.random.seed(seed)
+        self.state = self.start_state
+        self.steps = 0
+        return self.state
+
+    def step(self, action: int):
+        s = self.state
+        if self.indptr[s] <= action < self.indptr[s + 1]:
+            next_state = int(self.indices[action])
+            reward = float(self.rewards[action])
+        else:
+            # Kante gehört nicht zum aktuellen Knoten → große negative Strafe
+            next_state = s
+            reward = -10.0
+
+        self.state = next_state
+        self.steps += 1
+
+        done = (self.state == self.goal_state) or (self.steps >= self.max_steps)
+        info = {}
+        return next_state, reward, bool(done), info
+
+    def greedy_edges(self, Q):
+        """Greedy edge per node for a per-edge Q (first maximum, -1 for nodes without edges)."""
+        best = np.full(self.n_states, -1, dtype=np.int64)
+        has_edges = np.diff(self.indptr) > 0
+        if not has_edges.any():
+            return best
+        # Segment-Maximum je Knoten, dann erste Kante mit diesem Wert
+        seg_max = np.maximum.reduceat(Q, self.indptr[:-1][has_edges])
+        node_max = np.full(self.n_states, -np.inf)
+        node_max[has_edges] = seg_max
+        is_max = Q == node_max[self.edge_src]
+        edges = np.flatnonzero(is_max)
+        first = np.unique(self.edge_src[edges], return_index=True)[1]
+        best[self.edge_src[edges[first]]] = edges[first]
+        return best
+
+    def greedy_path(self, Q, start=None, max_steps=None):
+        """Node sequence of the greedy policy from start (default start_state) until the goal."""
+        best = self.greedy_edges(Q)
+        s = self.start_state if start is None else start
+        path = [s]
+        for _ in range(self.max_steps if max_steps is None else max_steps):
+            if s == self.goal_state or best[s] < 0:
+                break
+            s = int(self.indices[best[s]])
+            path.append(s)
+        return path
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from gridworld.raster import GridRaster, WALL
+from warehouse.graph_env import GraphWarehouseEnv, build_csr
+
+CACHE_DIR = ".layout_cache"
+
+# Zeichen der Text-Raster: '#' Wand, '.'/'0'/' ' frei, '1'..'3' Bottleneck-Level
+_TEXT_LUT = np.full(256, -1, dtype=np.int16)
+_TEXT_LUT[ord("#")] = WALL
+_TEXT_LUT[[ord("."), ord("0"), ord(" ")]] = 0
+_TEXT_LUT[[ord("1"), ord("2"), ord("3")]] = [1, 2, 3]
+
+# Graustufen-Bänder der Bilder (0 = schwarz): Wand, Level 3, Level 2, Level 1, frei
+_GRAY_EDGES = np.array([0.125, 0.375, 0.625, 0.875])
+_GRAY_VALUES = np.array([WALL, 3, 2, 1, 0], dtype=np.uint8)
+
+
+@dataclass
+class GraphLayout:
+    """
+    Facility graph in CSR form with travel cost per edge. node_names holds the original id of
+    every node (sorted names or integer ids), None if the file already used ids 0..n-1.
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    costs: np.ndarray
+    node_names: Optional[np.ndarray] = None
+
+    @property
+    def n_nodes(self):
+        return len(self.indptr) - 1
+
+    def node_id(self, name):
+        """Node id of a name/id from the edge list (binary search in the sorted node_names)."""
+        if self.node_names is None:
+            return int(name)
+        names = self.node_names
+        key = str(name) if names.dtype.kind in "US" else int(name)
+        i = int(np.searchsorted(names, key))
+        if i == len(names) or names[i] != key:
+            raise KeyError(name)
+        return i
+
+    def to_env(self, start_state=0, goal_state=None, goal_reward=1000.0, max_steps=100):
+        """
+        GraphWarehouseEnv with reward -cost per edge and goal_reward on every edge into the goal
+        (goal_state defaults to the last node, as in GraphWarehouseEnv).
+        """
+        goal_state = self.n_nodes - 1 if goal_state is None else goal_state
+        rewards = -np.asarray(self.costs, dtype=np.float32)
+        rewards[np.asarray(self.indices) == goal_state] = goal_reward
+        return GraphWarehouseEnv(self.indptr, self.indices, rewards,
+                                 start_state=start_state, goal_state=goal_state, max_steps=max_steps)
+
+    def to_reward_matrix(self, goal_state=None, goal_reward=1000.0):
+        """Dense reward matrix for WarehouseEnv (1.0 per edge as in build_reward_matrix; costs are dropped)."""
+        goal_state = self.n_nodes - 1 if goal_state is None else goal_state
+        R = np.zeros((self.n_nodes, self.n_nodes), dtype=float)
+        src = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        R[src, self.indices] = 1.0
+        R[src[np.asarray(self.indices) == goal_state], goal_state] = goal_reward
+        return R
+
+
+def _cache_path(path, cache_dir, kind, params):
+    """Cache directory for a layout file: key = file identity (path, size, mtime) + loader params."""
+    st = os.stat(path)
+    key = json.dumps([os.path.abspath(path), st.st_size, st.st_mtime_ns, kind, params], sort_keys=True)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    base = cache_dir if cache_dir is not None else os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    return os.path.join(base, f"{os.path.basename(path)}.{kind}.{digest}")
+
+
+def _load_cached(cache, names, mmap_mode="r"):
+    if not os.path.isdir(cache):
+        return None
+    arrays = {}
+    for name in names:
+        file = os.path.join(cache, name + ".npy")
+        if os.path.exists(file):
+            arrays[name] = np.load(file, mmap_mode=mmap_mode)
+    return arrays
+
+
+def _store_cached(cache, arrays):
+    """Writes the arrays as .npy files; the directory appears atomically (tmp dir + rename)."""
+    tmp = f"{cache}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for name, array in arrays.items():
+        if array is not None:
+            np.save(os.path.join(tmp, name + ".npy"), array)
+    try:
+        os.replace(tmp, cache)
+    except OSError:
+        # Paralleler Loader war schneller: dessen Cache behalten
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read_edge_columns(path, source, target, cost, delimiter):
+    """(src, dst, cost) string/float columns from a CSV with header or a JSON edge list."""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data["edges"]
+        if data and isinstance(data[0], dict):
+            src = np.array([e[source] for e in data]).astype(str)
+            dst = np.array([e[target] for e in data]).astype(str)
+            costs = np.array([e.get(cost, 1.0) for e in data], dtype=np.float32)
+        else:
+            table = np.array(data, dtype=object).reshape(len(data), -1)
+            src, dst = table[:, 0].astype(str), table[:, 1].astype(str)
+            costs = table[:, 2].astype(np.float32) if table.shape[1] > 2 else np.ones(len(data), dtype=np.float32)
+        return src, dst, costs
+
+    with open(path, "r", encoding="utf-8") as f:
+        header = [h.strip() for h in f.readline().split(delimiter)]
+    for name in (source, target):
+        if name not in header:
+            raise ValueError(f"Spalte '{name}' fehlt in {path}.")
+    use = [header.index(source), header.index(target)]
+    if cost in header:
+        use.append(header.index(cost))
+    table = np.loadtxt(path, dtype=str, delimiter=delimiter, skiprows=1, usecols=use, ndmin=2)
+    table = np.char.strip(table)
+    costs = table[:, 2].astype(np.float32) if len(use) > 2 else np.ones(len(table), dtype=np.float32)
+    return table[:, 0], table[:, 1], costs
+
+
+def load_edge_list(path, directed=False, source="src", target="dst", cost="cost",
+                   delimiter=",", cache_dir=None, use_cache=True):
+    """
+    Reads a CSV (header with source/target/cost) or JSON edge list into a GraphLayout, node ids
+    remapped to 0..n-1; the CSR arrays are cached as memory-mappable .npy (cache_dir).
+    """
+    params = dict(directed=directed, source=source, target=target, cost=cost, delimiter=delimiter)
+    cache = _cache_path(path, cache_dir, "graph", params)
+    names = ("indptr", "indices", "costs", "node_names")
+    if use_cache:
+        arrays = _load_cached(cache, names)
+        if arrays is not None:
+            return GraphLayout(arrays["indptr"], arrays["indices"], arrays["costs"], arrays.get("node_names"))
+
+    src, dst, costs = _read_edge_columns(path, source, target, cost, delimiter)
+    if len(src) and np.any(costs < 0):
+        raise ValueError("Reisekosten müssen nicht-negativ sein.")
+    try:
+        ids = np.concatenate([src, dst]).astype(np.int64)
+    except ValueError:
+        ids = np.concatenate([src, dst])
+    node_names, ids = np.unique(ids, return_inverse=True)
+    src_ids, dst_ids = ids[:len(src)], ids[len(src):]
+    n_nodes = len(node_names)
+    # Ids bereits 0..n-1: Identität, keine Namenstabelle nötig
+    if node_names.dtype.kind == "i" and np.array_equal(node_names, np.arange(n_nodes)):
+        node_names = None
+
+    indptr, indices, costs = build_csr(n_nodes, src_ids, dst_ids, costs, directed=directed)
+    layout = GraphLayout(indptr, indices, costs, node_names)
+    if use_cache:
+        _store_cached(cache, dict(indptr=indptr, indices=indices, costs=costs, node_names=node_names))
+    return layout
+
+
+def _read_text_raster(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    lines = raw.replace(b"\r", b"").rstrip(b"\n").split(b"\n")
+    width = len(lines[0])
+    if any(len(line) != width for line in lines):
+        raise ValueError(f"{path}: alle Zeilen müssen gleich lang sein.")
+    codes = _TEXT_LUT[np.frombuffer(b"".join(lines), dtype=np.uint8)]
+    if np.any(codes < 0):
+        raise ValueError(f"{path}: unbekanntes Zeichen im Raster (erlaubt: # . 0 1 2 3).")
+    return codes.astype(np.uint8).reshape(len(lines), width)
+
+
+def _read_image_raster(path):
+    import matplotlib.image as mpimg
+
+    image = mpimg.imread(path)
+    if image.dtype == np.uint8:
+        image = image / 255.0
+    if image.ndim == 3:
+        image = image[..., :3].mean(axis=2)
+    return _GRAY_VALUES[np.searchsorted(_GRAY_EDGES, image, side="right")]
+
+
+def load_grid_layout(path, cache_dir=None, use_cache=True):
+    """
+    Reads a grid layout into a GridRaster: text rasters ('#' wall, '.'/'0' free, '1'-'3'
+    bottleneck level, one line per row) are decoded with a lookup table over the raw bytes,
+    images by gray level (black wall, dark to light gray level 3/2/1, white free).
+    Cells and index arrays are cached as .npy; a second load memory-maps them
+    (cells copy-on-write, so update_cells still works without touching the cache).
+    """
+    cache = _cache_path(path, cache_dir, "grid", {})
+    names = ("cells", "state_index", "state_rows", "state_cols")
+    if use_cache:
+        arrays = _load_cached(cache, names, mmap_mode="c")
+        if arrays is not None:
+            return GridRaster.from_arrays(*(arrays[name] for name in names))
+
+    if path.lower().endswith((".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff")):
+        cells = _read_image_raster(path)
+    else:
+        cells = _read_text_raster(path)
+    raster = GridRaster(cells)
+    if use_cache:
+        _store_cached(cache, {name: getattr(raster, name) for name in names})
+    return raster